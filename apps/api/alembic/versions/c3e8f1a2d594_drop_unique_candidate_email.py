@@ -0,0 +1,29 @@
+"""drop unique constraint on candidate email
+
+Revision ID: c3e8f1a2d594
+Revises: b7c2d4e6f813
+Create Date: 2026-10-18 21:06:12.408391
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3e8f1a2d594"
+down_revision: Union[str, Sequence[str], None] = "b7c2d4e6f813"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index(op.f("ix_candidate_email"), table_name="candidate")
+    op.create_index(op.f("ix_candidate_email"), "candidate", ["email"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_candidate_email"), table_name="candidate")
+    op.create_index(op.f("ix_candidate_email"), "candidate", ["email"], unique=True)
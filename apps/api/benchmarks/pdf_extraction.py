@@ -0,0 +1,83 @@
+"""
+Compare serial page extraction against page-range sharded extraction in a
+process pool, on a synthetic PDF. The first parallel run creates the pool,
+later documents reuse it like a worker process does.
+
+Run with:
+
+    uv run python -m benchmarks.pdf_extraction --pages 500
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pymupdf
+
+from src.utils.pdf import extraction_pool, iter_page_texts, iter_page_texts_parallel
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+LINE = "Senior engineer with experience in Kubernetes, PySpark and SOC2 audits. "
+
+
+def create_document(path: Path, pages: int, lines_per_page: int):
+    doc = pymupdf.open()
+
+    for index in range(pages):
+        page = doc.new_page()
+        text = "\n".join(f"{index}:{line} {LINE}" for line in range(lines_per_page))
+        page.insert_textbox(page.rect + (36, 36, -36, -36), text, fontsize=6)
+
+    doc.save(path)
+    doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--lines-per-page", type=int, default=90)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pages-per-shard", type=int, default=25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "synthetic.pdf"
+        create_document(path, args.pages, args.lines_per_page)
+
+        start = time.perf_counter()
+        serial = list(iter_page_texts(path))
+        before = time.perf_counter() - start
+
+        timings = []
+        for _ in range(2):
+            start = time.perf_counter()
+            parallel = list(
+                iter_page_texts_parallel(
+                    path, workers=args.workers, pages_per_shard=args.pages_per_shard
+                )
+            )
+            timings.append(time.perf_counter() - start)
+
+            assert serial == parallel, (
+                "Parallel extraction changed page order or content"
+            )
+
+        extraction_pool.close()
+
+    cold, warm = timings
+    logger.info(f"Pages:    {args.pages} ({extraction_pool.size} workers)")
+    logger.info(f"Serial:   {args.pages / before:,.0f} pages/sec ({before:.2f}s)")
+    logger.info(f"Parallel: {args.pages / cold:,.0f} pages/sec ({cold:.2f}s, new pool)")
+    logger.info(
+        f"Parallel: {args.pages / warm:,.0f} pages/sec ({warm:.2f}s, reused pool)"
+    )
+    logger.info(f"Speedup:  {before / cold:.1f}x new pool, {before / warm:.1f}x reused")
+
+
+if __name__ == "__main__":
+    main()
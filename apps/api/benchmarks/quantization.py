@@ -0,0 +1,180 @@
+"""
+Compare recall and query latency of a quantized resume collection against the
+unquantized one, on synthetic clustered embeddings. Ground truth is an exact
+cosine search in numpy.
+
+Quantization is ignored by the in-memory client, so run it against a Qdrant
+server:
+
+    uv run python -m benchmarks.quantization --url http://localhost:6333 --points 20000
+"""
+
+import argparse
+import logging
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+QUANTIZATION: dict[str, QuantizationConfig | None] = {
+    "none": None,
+    "scalar": ScalarQuantization(
+        scalar=ScalarQuantizationConfig(
+            type=ScalarType.INT8, quantile=0.99, always_ram=True
+        )
+    ),
+    "binary": BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+}
+
+
+def create_centers(rng: np.random.Generator, dim: int, clusters: int):
+    return rng.normal(size=(clusters, dim)).astype(np.float32)
+
+
+def create_vectors(rng: np.random.Generator, centers: np.ndarray, count: int):
+    dim = centers.shape[1]
+    labels = rng.integers(0, len(centers), size=count)
+    vectors = centers[labels] + rng.normal(scale=0.5, size=(count, dim)).astype(
+        np.float32
+    )
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def create_collection(
+    client: QdrantClient,
+    name: str,
+    vectors: np.ndarray,
+    quantization: str,
+    on_disk: bool,
+):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(
+            size=vectors.shape[1],
+            distance=Distance.COSINE,
+            on_disk=on_disk,
+        ),
+        quantization_config=QUANTIZATION[quantization],
+    )
+    client.upload_collection(
+        collection_name=name,
+        vectors=vectors,
+        ids=list(range(len(vectors))),
+        batch_size=256,
+        wait=True,
+    )
+
+
+def measure(
+    client: QdrantClient,
+    name: str,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    limit: int,
+    search_params: SearchParams | None,
+):
+    latencies = []
+    recalls = []
+
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=name,
+            query=query.tolist(),
+            limit=limit,
+            search_params=search_params,
+        ).points
+        latencies.append(time.perf_counter() - start)
+
+        found = {point.id for point in points}
+        recalls.append(len(found & set(expected.tolist())) / limit)
+
+    return float(np.mean(recalls)), np.percentile(latencies, [50, 95]) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", type=str, default="http://localhost:6333")
+    parser.add_argument("--points", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--quantization", choices=["scalar", "binary"], default="scalar"
+    )
+    parser.add_argument("--oversampling", type=float, default=2.0)
+    parser.add_argument("--on-disk", action="store_true")
+    args = parser.parse_args()
+
+    client = QdrantClient(args.url)
+    rng = np.random.default_rng(0)
+
+    # Queries come from the same clusters as the corpus, like real searches
+    centers = create_centers(rng, args.dim, args.clusters)
+    vectors = create_vectors(rng, centers, args.points)
+    queries = create_vectors(rng, centers, args.queries)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, : args.limit]
+
+    create_collection(client, "benchmark_unquantized", vectors, "none", False)
+    create_collection(
+        client, "benchmark_quantized", vectors, args.quantization, args.on_disk
+    )
+
+    results = {
+        "unquantized": measure(
+            client, "benchmark_unquantized", queries, truth, args.limit, None
+        ),
+        args.quantization: measure(
+            client,
+            "benchmark_quantized",
+            queries,
+            truth,
+            args.limit,
+            SearchParams(quantization=QuantizationSearchParams(rescore=False)),
+        ),
+        f"{args.quantization} + rescore x{args.oversampling}": measure(
+            client,
+            "benchmark_quantized",
+            queries,
+            truth,
+            args.limit,
+            SearchParams(
+                quantization=QuantizationSearchParams(
+                    rescore=True, oversampling=args.oversampling
+                )
+            ),
+        ),
+    }
+
+    client.delete_collection("benchmark_unquantized")
+    client.delete_collection("benchmark_quantized")
+
+    logger.info(f"Points: {args.points} x {args.dim}, queries: {args.queries}")
+    for name, (recall, (p50, p95)) in results.items():
+        logger.info(
+            f"{name:<28} recall@{args.limit}: {recall:.3f}  "
+            f"p50: {p50:.1f}ms  p95: {p95:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
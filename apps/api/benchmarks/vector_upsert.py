@@ -0,0 +1,118 @@
+"""
+Compare per-chunk vector uploads against batched bulk uploads.
+
+Run with:
+
+    uv run python -m benchmarks.vector_upsert --files 50 --chunks 40
+"""
+
+import argparse
+import logging
+import time
+from uuid import uuid4, uuid5
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def create_collection(client: QdrantClient, name: str, dim: int):
+    if client.collection_exists(name):
+        client.delete_collection(name)
+
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+    )
+
+
+def per_chunk_upload(client: QdrantClient, name: str, vectors: np.ndarray, files: int):
+    chunks = len(vectors) // files
+
+    for file_index in range(files):
+        file_id = uuid4().hex
+        for chunk_index in range(chunks):
+            vector = vectors[file_index * chunks + chunk_index]
+            client.upload_points(
+                collection_name=name,
+                points=[
+                    PointStruct(
+                        id=uuid4().hex,
+                        vector=vector.tolist(),
+                        payload={"text": "", "file_id": file_id},
+                    )
+                ],
+            )
+
+
+def bulk_upload(
+    client: QdrantClient,
+    name: str,
+    vectors: np.ndarray,
+    files: int,
+    batch_size: int,
+    parallel: int,
+):
+    chunks = len(vectors) // files
+    ids: list[str] = []
+    payloads: list[dict] = []
+
+    for _ in range(files):
+        file_id = uuid4()
+        for chunk_index in range(chunks):
+            ids.append(uuid5(file_id, str(chunk_index)).hex)
+            payloads.append({"text": "", "file_id": file_id.hex})
+
+    client.upload_collection(
+        collection_name=name,
+        vectors=vectors,
+        payload=payloads,
+        ids=ids,
+        batch_size=batch_size,
+        parallel=parallel,
+        wait=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--chunks", type=int, default=40)
+    parser.add_argument("--dim", type=int, default=3072)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--parallel", type=int, default=1)
+    parser.add_argument("--url", type=str, default=":memory:")
+    args = parser.parse_args()
+
+    client = QdrantClient(args.url)
+    total = args.files * args.chunks
+    vectors = np.random.default_rng(0).random((total, args.dim), dtype=np.float32)
+
+    create_collection(client, "benchmark_per_chunk", args.dim)
+    start = time.perf_counter()
+    per_chunk_upload(client, "benchmark_per_chunk", vectors, args.files)
+    before = time.perf_counter() - start
+
+    create_collection(client, "benchmark_bulk", args.dim)
+    start = time.perf_counter()
+    bulk_upload(
+        client,
+        "benchmark_bulk",
+        vectors,
+        args.files,
+        args.batch_size,
+        args.parallel,
+    )
+    after = time.perf_counter() - start
+
+    logger.info(f"Points: {total} ({args.files} files x {args.chunks} chunks)")
+    logger.info(f"Per chunk: {total / before:,.0f} points/sec ({before:.2f}s)")
+    logger.info(f"Bulk:      {total / after:,.0f} points/sec ({after:.2f}s)")
+    logger.info(f"Speedup:   {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.exceptions import HTTPException
 from fastapi.responses import JSONResponse
@@ -5,9 +7,22 @@ from starlette.middleware.cors import CORSMiddleware
 
 from src.core.config import settings
 from src.core.exception import CustomException
+from src.core.vector_db import collection_bootstrap
+from src.modules.knowledge_base.controller import resolve_collection_spec
+from src.modules.llm_models.registry import model_registry
 from src.router import router
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.FASTEMBED_WARM_UP:
+        model_registry.warm_up()
+    if settings.VECTOR_DB_VALIDATE_ON_STARTUP:
+        collection_bootstrap.validate_existing(resolve_collection_spec)
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 if settings.all_cors_origins:
     app.add_middleware(
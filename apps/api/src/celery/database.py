@@ -0,0 +1,88 @@
+import os
+import threading
+from typing import Any
+
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from src.core.config import settings
+from src.core.db import create_database_engine
+
+
+class TaskSessionManager:
+    """
+    One database session per running task.
+
+    Sessions are thread-local, so tasks running side by side in a
+    `--pool=threads` worker never share a transaction, and are closed when
+    the task returns. The engine is created lazily in every worker process,
+    so pooled connections are never shared across a fork.
+    """
+
+    def __init__(self) -> None:
+        self.pool_size = settings.CELERY_DB_POOL_SIZE or settings.DB_POOL_SIZE
+        self._engine: Engine | None = None
+        self._pid: int | None = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def configure(self, concurrency: int) -> None:
+        """
+        Size the pool for the worker, one connection per concurrent task
+        unless `CELERY_DB_POOL_SIZE` is set.
+        """
+        if settings.CELERY_DB_POOL_SIZE is None:
+            self.pool_size = concurrency
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None or self._pid != os.getpid():
+            with self._lock:
+                if self._engine is None or self._pid != os.getpid():
+                    self._engine = create_database_engine(
+                        pool_size=self.pool_size,
+                        max_overflow=settings.DB_MAX_OVERFLOW,
+                    )
+                    self._pid = os.getpid()
+
+        return self._engine
+
+    @property
+    def session(self) -> Session:
+        session: Session | None = getattr(self._local, "session", None)
+
+        if session is None:
+            session = Session(self.engine)
+            self._local.session = session
+
+        return session
+
+    def close(self, failed: bool = False) -> None:
+        session: Session | None = getattr(self._local, "session", None)
+
+        if session is None:
+            return
+
+        try:
+            if failed:
+                session.rollback()
+        finally:
+            session.close()
+            self._local.session = None
+
+
+class TaskSession:
+    """
+    Stand-in for a `Session` that resolves to the running task's session, so
+    repositories and controllers can be built once and reused by every task.
+    """
+
+    def __init__(self, manager: TaskSessionManager) -> None:
+        self._manager = manager
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._manager.session, name)
+
+
+task_sessions = TaskSessionManager()
+task_session: Session = TaskSession(task_sessions)  # type: ignore
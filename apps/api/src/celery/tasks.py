@@ -1,20 +1,41 @@
+import os
+from functools import lru_cache
 from uuid import UUID
 
-import pymupdf
+from celery.concurrency import get_implementation
+from celery.schedules import crontab
+from celery.signals import (
+    task_postrun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
 from celery.utils.log import get_task_logger
 
-from celery import Celery
+from celery import Celery, chain, group
+from src.celery.database import task_session, task_sessions
+from src.celery.serialization import register_compressed_json
 from src.core.config import settings
-from src.core.dependencies import get_database_session
 from src.core.exception import BadRequestException
-from src.core.vector_db import vector_db_client
-from src.models.models import Candidate, KnowledgeBaseDocument, User
+from src.core.vector_db import collection_bootstrap, vector_db_client
+from src.models.models import (
+    Candidate,
+    IngestionBatch,
+    KnowledgeBaseDocument,
+    User,
+)
 from src.modules.candidate.controller import CandidateController
 from src.modules.candidate.repository import CandidateRepository
 from src.modules.candidate.schema import CandidateCreate
 from src.modules.file_storage.controller import FileController
+from src.modules.ingestion_batch.repository import IngestionBatchRepository
+from src.modules.knowledge_base.progress import ingestion_progress
+from src.modules.llm_models.registry import model_registry
 from src.modules.users.controller import UserController
 from src.modules.users.repository import UserRepository
+from src.utils.minhash import MinHasher
+from src.utils.pdf import PAGE_SEPARATOR, extraction_pool, iter_document_pages
 from src.utils.resume_parser import ResumeParser
 
 logger = get_task_logger(__name__)
@@ -29,78 +50,365 @@ app.conf.task_track_started = True
 app.conf.result_extended = True
 app.conf.database_create_tables_at_setup = True
 
-session_generator = get_database_session()
-session = next(session_generator)
+# Tasks return ids and small status structs only; document content lives in
+# the application tables. Results expire after a TTL.
+app.conf.result_expires = settings.CELERY_RESULT_EXPIRES_SECONDS
+if settings.CELERY_RESULT_COMPRESSION and settings.CELERY_RESULT_BACKEND == "redis":
+    # The database backend pickles results into its own column whatever the
+    # serializer, only the redis backend stores serialized payloads
+    app.conf.result_serializer = register_compressed_json()
+    app.conf.result_accept_content = [app.conf.result_serializer]
+
+if settings.CELERY_RESULT_BACKEND == "database":
+    # The database backend doesn't expire rows by itself, purge them hourly
+    # instead of celery beat's default of once a day.
+    app.conf.beat_schedule = {
+        "celery.backend_cleanup": {
+            "task": "celery.backend_cleanup",
+            "schedule": crontab(minute="0"),
+            "options": {"expires": 3600},
+        }
+    }
+
+# Every pipeline stage has its own queue so it can be served by a worker with
+# a matching pool: CPU-bound stages on prefork, network-bound ones on threads.
+app.conf.task_default_queue = "default"
+app.conf.task_routes = {
+    "parse_document": {"queue": "parsing"},
+    "store_embedding": {"queue": "embedding"},
+    "store_batch_embeddings": {"queue": "embedding"},
+    "create_candidate": {"queue": "llm"},
+    "create_candidate_embeddings": {"queue": "candidate_embedding"},
+    "migrate_vector_collections": {"queue": "maintenance"},
+    "reindex_knowledge_bases": {"queue": "maintenance"},
+    "fingerprint_documents": {"queue": "maintenance"},
+}
+app.conf.worker_prefetch_multiplier = settings.CELERY_PREFETCH_MULTIPLIER
+
+
+@worker_process_init.connect
+def warm_up_models(**kwargs):
+    if settings.FASTEMBED_WARM_UP:
+        model_registry.warm_up(reranker=False)
+
+
+@worker_process_init.connect
+def validate_vector_collections(**kwargs):
+    if not settings.VECTOR_DB_VALIDATE_ON_STARTUP:
+        return
+
+    from src.modules.knowledge_base.controller import resolve_collection_spec
+
+    collection_bootstrap.validate_existing(resolve_collection_spec)
+
+
+@worker_init.connect
+def configure_database_pool(sender, **kwargs):
+    task_sessions.configure(concurrency=sender.concurrency)
+
+
+@worker_init.connect
+def configure_extraction_pool(sender, **kwargs):
+    # Concurrent parsing tasks share the CPUs, so each gets its share of
+    # extraction processes instead of one per CPU
+    extraction_pool.configure(
+        settings.DOCUMENT_PARALLEL_EXTRACTION_WORKERS
+        or (os.cpu_count() or 1) // sender.concurrency
+    )
 
 
-@app.task(name="parse_document")
-def parse_document(file_uri: str, file_id: UUID):
-    file_path = FileController._get_local_file_path(file_name=file_uri)
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_extraction_pool(**kwargs):
+    extraction_pool.close()
 
-    if not file_path.exists():
-        raise Exception(f"File {file_uri} does not exists")
 
-    doc = pymupdf.open(file_path.resolve())
+@worker_init.connect
+def initialize_worker(sender, **kwargs):
+    # Thread, solo and green pools run tasks in the main process, which never
+    # sees `worker_process_init`
+    if get_implementation(sender.pool_cls) is get_implementation("prefork"):
+        return
+
+    warm_up_models()
+    validate_vector_collections()
+
+
+@task_postrun.connect
+def close_task_session(state=None, **kwargs):
+    task_sessions.close(failed=state != "SUCCESS")
+
+
+# Controllers are built once per process. Their repositories hold a proxy
+# that resolves to the running task's session.
+
+
+@lru_cache
+def get_user_controller() -> UserController:
+    return UserController(repository=UserRepository(model=User, session=task_session))
+
 
-    pages: list[str] = [page.get_text() for page in doc]  # type: ignore
-    result = chr(12).join(pages)
+@lru_cache
+def get_candidate_controller() -> CandidateController:
+    return CandidateController(
+        repository=CandidateRepository(model=Candidate, session=task_session),
+        vector_db=vector_db_client,
+    )
 
-    doc.close()
 
+@lru_cache
+def get_knowledge_base_controller():
     from src.modules.knowledge_base.controller import KnowledgeBaseController
     from src.modules.knowledge_base.repository import KnowledgeBaseDocumentRepository
 
-    knowledge_base_controller = KnowledgeBaseController(
+    return KnowledgeBaseController(
         repository=KnowledgeBaseDocumentRepository(
-            model=KnowledgeBaseDocument, session=session
+            model=KnowledgeBaseDocument, session=task_session
         ),
         vector_db=vector_db_client,
     )
 
-    record = knowledge_base_controller.repository.upsert_by_file(file_id=file_id)
-    record = knowledge_base_controller.repository.update(record.id, {"content": result})
 
-    return result
+@lru_cache
+def get_ingestion_batch_repository() -> IngestionBatchRepository:
+    return IngestionBatchRepository(model=IngestionBatch, session=task_session)
 
 
-@app.task(name="store_embedding")
-def store_embeddings(content: str, file_id: UUID, user_id: UUID):
-    user_controller = UserController(
-        repository=UserRepository(model=User, session=session)
+@app.task(name="parse_document")
+def parse_document(
+    file_uri: str,
+    file_id: UUID,
+    batch_id: UUID | None = None,
+    user_id: UUID | None = None,
+):
+    try:
+        return _parse_document(file_uri, file_id, batch_id, user_id)
+    except Exception as e:
+        if batch_id is None:
+            raise e
+
+        # Inside a batch a single bad file must not fail the whole chord.
+        logger.error(f"Failed to parse {file_uri} in batch {batch_id}: {e}")
+        task_session.rollback()
+        fail_file_ingestion(file_id)
+        get_ingestion_batch_repository().increment(batch_id, failed=1)
+        ingestion_progress.publish(
+            user_id, "failed", file_id=file_id, batch_id=batch_id, error=str(e)
+        )
+        return None
+
+
+def _parse_document(
+    file_uri: str, file_id: UUID, batch_id: UUID | None, user_id: UUID | None
+):
+    file_path = FileController._get_local_file_path(file_name=file_uri)
+
+    if not file_path.exists():
+        raise Exception(f"File {file_uri} does not exists")
+
+    knowledge_base_controller = get_knowledge_base_controller()
+
+    record = knowledge_base_controller.repository.upsert_by_file(file_id=file_id)
+    # Only ids are kept: the record expires on every commit below, and
+    # touching it again would load the content appended so far.
+    record_id, owner_id = record.id, record.file.owner_id
+    knowledge_base_controller.repository.update_columns(
+        [record_id], {"content": "", "ingestion_status": "PROGRESS"}
     )
 
-    user = user_controller.get_by_id(user_id)
+    pages: list[str] = []
+    page_count = 0
+    hasher = MinHasher()
 
-    from src.modules.knowledge_base.controller import KnowledgeBaseController
-    from src.modules.knowledge_base.repository import KnowledgeBaseDocumentRepository
+    page_texts = iter_document_pages(
+        file_path,
+        parallel_min_pages=settings.DOCUMENT_PARALLEL_EXTRACTION_MIN_PAGES,
+        pages_per_shard=settings.DOCUMENT_PARALLEL_EXTRACTION_PAGES_PER_SHARD,
+    )
 
-    knowledge_base_controller = KnowledgeBaseController(
-        repository=KnowledgeBaseDocumentRepository(
-            model=KnowledgeBaseDocument, session=session
-        ),
-        vector_db=vector_db_client,
+    for page_count, text in enumerate(page_texts, start=1):
+        page = text if page_count == 1 else PAGE_SEPARATOR + text
+        pages.append(page)
+        hasher.update(page)
+
+        if len(pages) >= settings.DOCUMENT_EXTRACTION_FLUSH_PAGES:
+            knowledge_base_controller.repository.append_content(
+                record_id, "".join(pages)
+            )
+            pages.clear()
+            ingestion_progress.publish(
+                user_id,
+                "parsing",
+                file_id=file_id,
+                knowledge_base_document_id=record_id,
+                batch_id=batch_id,
+                pages=page_count,
+            )
+
+    if pages:
+        knowledge_base_controller.repository.append_content(record_id, "".join(pages))
+
+    logger.info(f"Extracted {page_count} pages from {file_uri}")
+    ingestion_progress.publish(
+        user_id,
+        "parsed",
+        file_id=file_id,
+        knowledge_base_document_id=record_id,
+        batch_id=batch_id,
+        pages=page_count,
     )
 
-    document = knowledge_base_controller.get_document_by_file_id(
-        user=user, file_id=file_id
+    original = knowledge_base_controller.link_near_duplicate(
+        record_id, owner_id, hasher.signature()
+    )
+
+    if original is not None:
+        # A near-duplicate resolves to the existing candidate: the rest of the
+        # chain sees `None` and skips embedding and extraction. An original
+        # still being ingested has no candidate yet, the duplicate's owner is
+        # notified once it is created.
+        ingestion_progress.publish(
+            user_id,
+            "duplicate",
+            file_id=file_id,
+            knowledge_base_document_id=record_id,
+            duplicate_of_id=original.id,
+            candidate_id=original.candidate_id,
+            batch_id=batch_id,
+        )
+
+        if batch_id is not None:
+            get_ingestion_batch_repository().increment(batch_id, done=1)
+
+        return None
+
+    return record_id.hex
+
+
+@app.task(name="store_embedding")
+def store_embeddings(knowledge_base_document_id: str | None, user_id: UUID):
+    if knowledge_base_document_id is None:
+        return None
+
+    user_controller = get_user_controller()
+
+    user = user_controller.get_by_id(user_id)
+
+    knowledge_base_controller = get_knowledge_base_controller()
+
+    document = knowledge_base_controller.get_document_by_id(
+        id=UUID(knowledge_base_document_id), user=user
     )
 
     knowledge_base_controller.ingest_documents(user=user, files=[document.file])
+    publish_embedded(user_id, [document])
 
     return document.id.hex
 
 
-@app.task(name="create_candidate")
-def create_candidate(knowledge_base_document_id: UUID):
-    from src.modules.knowledge_base.controller import KnowledgeBaseController
-    from src.modules.knowledge_base.repository import KnowledgeBaseDocumentRepository
+def publish_embedded(
+    user_id: UUID, documents: list[KnowledgeBaseDocument], batch_id: UUID | None = None
+):
+    for document in documents:
+        manifest = document.ingest_manifest or {}
+        ingestion_progress.publish(
+            user_id,
+            "embedded",
+            file_id=document.file_id,
+            knowledge_base_document_id=document.id,
+            batch_id=batch_id,
+            chunks=len(manifest.get("chunk_hashes", [])),
+        )
 
-    knowledge_base_controller = KnowledgeBaseController(
-        repository=KnowledgeBaseDocumentRepository(
-            model=KnowledgeBaseDocument, session=session
-        ),
-        vector_db=vector_db_client,
+
+@app.task(name="store_batch_embeddings")
+def store_batch_embeddings(
+    knowledge_base_document_ids: list[str | None], user_id: UUID, batch_id: UUID
+):
+    document_ids = [UUID(id) for id in knowledge_base_document_ids if id is not None]
+
+    if len(document_ids) == 0:
+        return []
+
+    user_controller = get_user_controller()
+    batch_repository = get_ingestion_batch_repository()
+
+    user = user_controller.get_by_id(user_id)
+
+    knowledge_base_controller = get_knowledge_base_controller()
+
+    try:
+        documents = [
+            knowledge_base_controller.get_document_by_id(id=id, user=user)
+            for id in document_ids
+        ]
+        knowledge_base_controller.ingest_documents(
+            user=user, files=[document.file for document in documents]
+        )
+    except Exception as e:
+        task_session.rollback()
+        knowledge_base_controller.fail_ingestion(document_ids)
+        batch_repository.increment(batch_id, failed=len(document_ids))
+        raise e
+
+    publish_embedded(user_id, documents, batch_id)
+
+    workflows = []
+    for id in document_ids:
+        workflow = chain(
+            create_candidate.si(id.hex),  # type: ignore
+            create_candidate_embeddings.s(user_id, batch_id),  # type: ignore
+        )
+        workflow.link_error(
+            mark_batch_document_failed.si(batch_id, id.hex, user_id)  # type: ignore
+        )
+        workflows.append(workflow)
+
+    group(workflows).apply_async()
+
+    return [id.hex for id in document_ids]
+
+
+@app.task(name="mark_batch_document_failed", ignore_result=True)
+def mark_batch_document_failed(
+    batch_id: UUID,
+    knowledge_base_document_id: str | None = None,
+    user_id: UUID | None = None,
+):
+    if knowledge_base_document_id is not None:
+        get_knowledge_base_controller().fail_ingestion(
+            [UUID(knowledge_base_document_id)]
+        )
+
+    get_ingestion_batch_repository().increment(batch_id, failed=1)
+    ingestion_progress.publish(
+        user_id,
+        "failed",
+        knowledge_base_document_id=knowledge_base_document_id,
+        batch_id=batch_id,
     )
+
+
+@app.task(name="publish_ingestion_failure", ignore_result=True)
+def publish_ingestion_failure(file_id: UUID, user_id: UUID):
+    fail_file_ingestion(file_id)
+    ingestion_progress.publish(user_id, "failed", file_id=file_id)
+
+
+def fail_file_ingestion(file_id: UUID):
+    knowledge_base_controller = get_knowledge_base_controller()
+    document_id = knowledge_base_controller.repository.get_id_by_file_id(file_id)
+
+    if document_id is not None:
+        knowledge_base_controller.fail_ingestion([document_id])
+
+
+@app.task(name="create_candidate")
+def create_candidate(knowledge_base_document_id: UUID | None):
+    if knowledge_base_document_id is None:
+        return None
+
+    knowledge_base_controller = get_knowledge_base_controller()
     document = knowledge_base_controller.get_by_id(knowledge_base_document_id)
     content = document.content
 
@@ -113,10 +421,7 @@ def create_candidate(knowledge_base_document_id: UUID):
     name = ResumeParser.extract_name(content)
     contact = ResumeParser.extract_contact_number_from_resume(content)
 
-    candidate_controller = CandidateController(
-        repository=CandidateRepository(model=Candidate, session=session),
-        vector_db=vector_db_client,
-    )
+    candidate_controller = get_candidate_controller()
 
     resume_parse = ResumeParser()
     output = resume_parse.extract_resume_details(content=content)
@@ -149,22 +454,145 @@ def create_candidate(knowledge_base_document_id: UUID):
 
     candidate = candidate_controller.create(candidate)
 
+    ingestion_progress.publish(
+        document.file.owner_id,
+        "candidate_created",
+        file_id=document.file_id,
+        knowledge_base_document_id=document.id,
+        candidate_id=candidate.id,
+    )
+
+    # The owner's copies linked to this document while it was being ingested
+    for duplicate in knowledge_base_controller.repository.get_duplicates_of(
+        document.id
+    ):
+        ingestion_progress.publish(
+            duplicate.file.owner_id,
+            "candidate_created",
+            file_id=duplicate.file_id,
+            knowledge_base_document_id=duplicate.id,
+            candidate_id=candidate.id,
+        )
+
     return candidate.id
 
 
 @app.task(name="create_candidate_embeddings")
-def create_candidate_embeddings(candidate_id: UUID, user_id: UUID):
-    user_controller = UserController(
-        repository=UserRepository(model=User, session=session)
-    )
+def create_candidate_embeddings(
+    candidate_id: UUID | None, user_id: UUID, batch_id: UUID | None = None
+):
+    if candidate_id is None:
+        return None
+
+    user_controller = get_user_controller()
 
     user = user_controller.get_by_id(user_id)
 
-    candidate_controller = CandidateController(
-        repository=CandidateRepository(model=Candidate, session=session),
-        vector_db=vector_db_client,
-    )
+    candidate_controller = get_candidate_controller()
 
     candidate_controller.ingest_candidate(candidate_id=candidate_id, user=user)
 
-    return None
+    if batch_id is not None:
+        get_ingestion_batch_repository().increment(batch_id, done=1)
+
+    candidate = candidate_controller.repository.get_by_id(candidate_id)
+    get_knowledge_base_controller().repository.update_columns(
+        [candidate.knowledge_base_document_id], {"ingestion_status": "SUCCESS"}
+    )
+    ingestion_progress.publish(
+        user_id,
+        "completed",
+        knowledge_base_document_id=candidate.knowledge_base_document_id,
+        candidate_id=candidate_id,
+        batch_id=batch_id,
+    )
+
+    return {
+        "candidate_id": candidate_id,
+        "knowledge_base_document_id": candidate.knowledge_base_document_id,
+    }
+
+
+@app.task(name="migrate_vector_collections")
+def migrate_vector_collections(delete_source: bool = False, page_size: int = 100):
+    """
+    Move every user's per-user collections into the shared multitenant
+    collections. Safe to re-run: point ids are preserved.
+    """
+    user_repository = get_user_controller().repository
+    knowledge_base_controller = get_knowledge_base_controller()
+    candidate_controller = get_candidate_controller()
+
+    migrated = 0
+    cursor = None
+
+    while users := user_repository.get_page(after=cursor, limit=page_size):
+        for user in users:
+            migrated += knowledge_base_controller.migrate_to_shared_collection(
+                user, delete_source=delete_source
+            )
+            migrated += candidate_controller.migrate_to_shared_collection(
+                user, delete_source=delete_source
+            )
+
+        cursor = users[-1].id
+
+    logger.info(f"Migrated {migrated} points into shared collections")
+
+    return migrated
+
+
+@app.task(name="fingerprint_documents")
+def fingerprint_documents(page_size: int = 100):
+    """
+    Backfill near-duplicate fingerprints of documents extracted before
+    deduplication was introduced. Existing documents are not linked.
+    """
+    knowledge_base_controller = get_knowledge_base_controller()
+
+    fingerprinted = 0
+    cursor = None
+
+    while documents := knowledge_base_controller.repository.get_page_with_content(
+        owner_id=None, after=cursor, limit=page_size
+    ):
+        for document in documents:
+            if document.minhash is None:
+                knowledge_base_controller.fingerprint_document(document)
+                fingerprinted += 1
+
+        cursor = documents[-1].id
+
+    logger.info(f"Fingerprinted {fingerprinted} documents")
+
+    return {"fingerprinted": fingerprinted}
+
+
+@app.task(name="reindex_knowledge_bases")
+def reindex_knowledge_bases(page_size: int = 100):
+    """
+    Re-embed every knowledge base collection with the current embedding
+    settings, one collection after another, swapping each alias when done.
+    """
+    knowledge_base_controller = get_knowledge_base_controller()
+
+    if settings.VECTOR_DB_MULTITENANT:
+        collection = knowledge_base_controller.reindex_collection(
+            settings.VECTOR_DB_KNOWLEDGE_BASE_COLLECTION
+        )
+        return {"collections": int(collection is not None)}
+
+    user_repository = get_user_controller().repository
+    collections = 0
+    cursor = None
+
+    while users := user_repository.get_page(after=cursor, limit=page_size):
+        for user in users:
+            collection = knowledge_base_controller.reindex_collection(
+                knowledge_base_controller._get_collection_name(user), user=user
+            )
+            collections += int(collection is not None)
+
+        cursor = users[-1].id
+
+    return {"collections": collections}
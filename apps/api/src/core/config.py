@@ -50,6 +50,18 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = ""
     POSTGRES_DB: str = ""
 
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    CELERY_DB_POOL_SIZE: int | None = None
+    CELERY_PREFETCH_MULTIPLIER: int = 1
+    # "redis" keeps results next to the broker and expires them natively,
+    # "database" needs celery beat running for `celery.backend_cleanup`.
+    CELERY_RESULT_BACKEND: Literal["database", "redis"] = "database"
+    CELERY_RESULT_EXPIRES_SECONDS: int = 86400
+    # zlib-compressed JSON results, only applies to the redis backend
+    CELERY_RESULT_COMPRESSION: bool = True
+
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
@@ -65,6 +77,9 @@ class Settings(BaseSettings):
     @computed_field
     @property
     def CELERY_BACKEND_URI(self) -> str:
+        if self.CELERY_RESULT_BACKEND == "redis":
+            return self.REDIS_URL
+
         uri = MultiHostUrl.build(
             scheme="db+postgresql",
             username=self.POSTGRES_USER,
@@ -91,7 +106,83 @@ class Settings(BaseSettings):
     DEFAULT_LLM: LlmModelName = "azure-gpt-4o"
     DEFAULT_EMBEDDING_MODEL: EmbeddingProvider = "azure-openai"
 
+    EMBEDDING_DIMENSIONS: int | None = None
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+
+    EMBEDDING_CACHE_BACKEND: Literal["redis", "disk", "none"] = "redis"
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 500_000
+    EMBEDDING_CACHE_TTL_SECONDS: int | None = None
+    # After a Redis error the cache uses the disk store this long before
+    # trying Redis again.
+    EMBEDDING_CACHE_RETRY_SECONDS: float = 30
+
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_TTL_SECONDS: int | None = None
+
+    INGESTION_BATCH_CHUNK_SIZE: int = 50
+    INGESTION_INCREMENTAL: bool = True
+    # Near-duplicate uploads (estimated Jaccard similarity of the content at
+    # or above the threshold) are linked to the existing candidate instead of
+    # being embedded and extracted again.
+    DEDUP_ENABLED: bool = True
+    DEDUP_THRESHOLD: float = 0.8
+
+    DOCUMENT_EXTRACTION_FLUSH_PAGES: int = 16
+    DOCUMENT_PARALLEL_EXTRACTION_MIN_PAGES: int = 300
+    # Extraction processes per worker process, defaults to the CPUs divided
+    # by the worker concurrency. Below two, documents are extracted serially.
+    DOCUMENT_PARALLEL_EXTRACTION_WORKERS: int | None = None
+    DOCUMENT_PARALLEL_EXTRACTION_PAGES_PER_SHARD: int = 25
+
+    FASTEMBED_CACHE_DIR: str | None = None
+    FASTEMBED_THREADS: int | None = None
+    FASTEMBED_WARM_UP: bool = True
+    RERANKER_THREADS: int | None = None
+    RERANKER_BATCH_SIZE: int = 16
+    # While requests fall back to vector order because the reranker is over
+    # budget, one batch is scored in the background at most this often to
+    # re-measure its latency.
+    RERANKER_PROBE_INTERVAL_SECONDS: float = 10
+
+    # Query embeddings and rerank jobs of concurrent chat requests are
+    # coalesced into micro-batches of up to `MAX_BATCH_SIZE` texts (rerank:
+    # query-document pairs), waiting at most `MAX_WAIT_MS` for a batch to fill.
+    INFERENCE_BATCHING_ENABLED: bool = True
+    INFERENCE_MAX_BATCH_SIZE: int = 32
+    INFERENCE_RERANK_MAX_BATCH_SIZE: int = 64
+    INFERENCE_MAX_WAIT_MS: float = 5
+    INFERENCE_MAX_QUEUE_SIZE: int = 256
+
+    # Resume chunks are retrieved with a dense and a BM25 prefetch fused
+    # server-side. Weights only apply to RRF. Collections without the sparse
+    # vector are searched dense-only until re-indexed.
+    RESUME_RETRIEVAL_FUSION: Literal["rrf", "dbsf"] = "rrf"
+    RESUME_RETRIEVAL_DENSE_PREFETCH: int = 50
+    RESUME_RETRIEVAL_SPARSE_PREFETCH: int = 50
+    RESUME_RETRIEVAL_DENSE_WEIGHT: float = 1.0
+    RESUME_RETRIEVAL_SPARSE_WEIGHT: float = 1.0
+    # Two stages: `CANDIDATES` hits from the vector store are reranked with
+    # the cross-encoder and the best `LIMIT` are kept. Past the budget the
+    # hits keep their vector order.
+    RESUME_RETRIEVAL_CANDIDATES: int = 50
+    RESUME_RETRIEVAL_LIMIT: int = 5
+    RESUME_RERANK_BUDGET_MS: int | None = 300
+
     VECTOR_DB_URL: str = "http://localhost:6333"
+    VECTOR_DB_UPLOAD_BATCH_SIZE: int = 256
+    VECTOR_DB_UPLOAD_PARALLEL: int = 1
+    VECTOR_DB_MULTITENANT: bool = False
+    VECTOR_DB_KNOWLEDGE_BASE_COLLECTION: str = "knowledge_base"
+    VECTOR_DB_CANDIDATE_COLLECTION: str = "candidate"
+    VECTOR_DB_VALIDATE_ON_STARTUP: bool = True
+    VECTOR_DB_QUANTIZATION: Literal["none", "scalar", "binary"] = "none"
+    VECTOR_DB_QUANTIZATION_OVERSAMPLING: float = 2.0
+    VECTOR_DB_QUANTIZATION_RESCORE: bool = True
+    VECTOR_DB_ON_DISK: bool = False
+    VECTOR_DB_REINDEX_BATCH_SIZE: int = 16
+    VECTOR_DB_REINDEX_INTERVAL_SECONDS: float = 1.0
 
     REDIS_URL: str = "redis://localhost:6379"
 
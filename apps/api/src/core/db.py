@@ -1,7 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 
 from src.core.config import settings
 
-engine = create_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI), echo=settings.SHOW_DB_LOGS
-)
+
+def create_database_engine(
+    pool_size: int = settings.DB_POOL_SIZE,
+    max_overflow: int = settings.DB_MAX_OVERFLOW,
+) -> Engine:
+    return create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        echo=settings.SHOW_DB_LOGS,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+
+
+engine = create_database_engine()
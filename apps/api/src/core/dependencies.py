@@ -1,7 +1,7 @@
 from functools import lru_cache
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import ExpiredSignatureError, InvalidTokenError
 from pydantic import ValidationError
@@ -36,8 +36,14 @@ reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"/api/auth/login")
 
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
+optional_oauth2 = OAuth2PasswordBearer(tokenUrl=f"/api/auth/login", auto_error=False)
+
 
 def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    return get_user_from_token(session, token)
+
+
+def get_user_from_token(session: Session, token: str) -> User:
     try:
         payload = JwtHandler.validate_token(token)
         token_data = TokenPayload(**payload)
@@ -60,6 +66,35 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
+def get_stream_user(
+    token: Annotated[str | None, Depends(optional_oauth2)],
+    access_token: Annotated[str | None, Query()] = None,
+) -> User:
+    """
+    User of a long-lived stream. The user is loaded with its own short-lived
+    session, since a yield dependency would hold a pooled connection until the
+    stream ends. Browser `EventSource` can't set headers, so the token may also
+    come as the `access_token` query parameter.
+    """
+    token = token or access_token
+
+    if token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    with Session(engine) as session:
+        user = get_user_from_token(session, token)
+        session.expunge(user)
+
+    return user
+
+
+StreamUser = Annotated[User, Depends(get_stream_user)]
+
+
 def get_vector_database():
     return vector_db_client
 
@@ -1,16 +1,29 @@
+from contextlib import contextmanager
 from functools import partial
-from typing import Annotated
+from typing import Annotated, Iterator
 
 from fastapi import Depends
+from sqlmodel import Session
 
+from src.core.db import engine
 from src.core.dependencies import SessionDep, VectorDatabaseDep
-from src.models.models import Candidate, File, KnowledgeBaseDocument, User
+from src.core.vector_db import vector_db_client
+from src.models.models import (
+    Candidate,
+    File,
+    IngestionBatch,
+    KnowledgeBaseDocument,
+    User,
+)
 from src.modules.agent.controller import AgentController
+from src.modules.agent.scope import AgentScope
 from src.modules.auth.controller import AuthController
 from src.modules.candidate.controller import CandidateController
 from src.modules.candidate.repository import CandidateRepository
 from src.modules.file_storage.controller import FileController
 from src.modules.file_storage.repository import FileRepository
+from src.modules.ingestion_batch.controller import IngestionBatchController
+from src.modules.ingestion_batch.repository import IngestionBatchRepository
 from src.modules.knowledge_base.controller import KnowledgeBaseController
 from src.modules.knowledge_base.repository import KnowledgeBaseDocumentRepository
 from src.modules.users.controller import UserController
@@ -24,6 +37,7 @@ class Factory:
         KnowledgeBaseDocumentRepository, KnowledgeBaseDocument
     )
     candidate_repository = partial(CandidateRepository, Candidate)
+    ingestion_batch_repository = partial(IngestionBatchRepository, IngestionBatch)
 
     def get_user_controller(self, db_session: SessionDep):
         return UserController(repository=self.user_repository(session=db_session))
@@ -32,7 +46,20 @@ class Factory:
         return AuthController(repository=self.user_repository(session=db_session))
 
     def get_agent_controller(self):
-        return AgentController()
+        return AgentController(scope=self.agent_scope)
+
+    @contextmanager
+    def agent_scope(self) -> Iterator[AgentScope]:
+        with Session(engine) as session:
+            yield AgentScope(
+                file_controller=self.get_file_controller(session),
+                candidate_controller=self.get_candidate_controller(
+                    vector_db_client, session
+                ),
+                knowledge_base_controller=self.get_knowledge_base_controller(
+                    vector_db_client, session
+                ),
+            )
 
     def get_file_controller(self, db_session: SessionDep):
         return FileController(repository=self.file_repository(session=db_session))
@@ -53,6 +80,11 @@ class Factory:
             vector_db=vector_db,
         )
 
+    def get_ingestion_batch_controller(self, db_session: SessionDep):
+        return IngestionBatchController(
+            repository=self.ingestion_batch_repository(session=db_session)
+        )
+
 
 UserControllerDeps = Annotated[UserController, Depends(Factory().get_user_controller)]
 AuthControllerDeps = Annotated[AuthController, Depends(Factory().get_auth_controller)]
@@ -66,3 +98,6 @@ KnowledgeBaseControllerDeps = Annotated[
 CandidateControllerDeps = Annotated[
     CandidateController, Depends(Factory().get_candidate_controller)
 ]
+IngestionBatchControllerDeps = Annotated[
+    IngestionBatchController, Depends(Factory().get_ingestion_batch_controller)
+]
@@ -0,0 +1,7 @@
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from src.core.config import settings
+
+redis_client = Redis.from_url(settings.REDIS_URL)
+async_redis_client = AsyncRedis.from_url(settings.REDIS_URL)
@@ -1,5 +1,611 @@
-from qdrant_client import QdrantClient
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CollectionInfo,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchValue,
+    PointStruct,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    SparseVectorParams,
+    VectorParams,
+)
+from redis import Redis
+from redis.exceptions import RedisError
 
 from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis import redis_client
 
 vector_db_client = QdrantClient(settings.VECTOR_DB_URL)
+# Used by the async chat path, so searches don't hold a threadpool thread
+async_vector_db_client = AsyncQdrantClient(settings.VECTOR_DB_URL)
+
+TENANT_FIELD = "user_id"
+
+
+def get_tenant_hnsw_config() -> HnswConfigDiff | None:
+    """
+    In the multitenant layout the global HNSW graph is disabled and one graph
+    is built per tenant (`payload_m`), since every query filters by tenant.
+    """
+    if not settings.VECTOR_DB_MULTITENANT:
+        return None
+
+    return HnswConfigDiff(m=0, payload_m=16)
+
+
+def get_quantization_config() -> QuantizationConfig | None:
+    """
+    Quantized vectors are always kept in RAM; with `VECTOR_DB_ON_DISK` the
+    original vectors are served from disk and only read to rescore.
+    """
+    match settings.VECTOR_DB_QUANTIZATION:
+        case "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(
+                    type=ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        case "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        case _:
+            return None
+
+
+def get_quantization_search_params() -> SearchParams | None:
+    if settings.VECTOR_DB_QUANTIZATION == "none":
+        return None
+
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            rescore=settings.VECTOR_DB_QUANTIZATION_RESCORE,
+            oversampling=settings.VECTOR_DB_QUANTIZATION_OVERSAMPLING,
+        )
+    )
+
+
+def get_tenant_filter(user_id: str) -> Filter | None:
+    if not settings.VECTOR_DB_MULTITENANT:
+        return None
+
+    return Filter(
+        must=[FieldCondition(key=TENANT_FIELD, match=MatchValue(value=user_id))]
+    )
+
+
+def create_payload_indexes(
+    client: QdrantClient, collection_name: str, fields: list[str]
+) -> None:
+    """
+    Keyword indexes for the fields we filter on. In the multitenant layout the
+    tenant field is indexed as well, marked as the tenant partition.
+    """
+    for field in fields:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field,
+            field_schema=KeywordIndexParams(type=KeywordIndexType.KEYWORD),
+        )
+
+    if settings.VECTOR_DB_MULTITENANT:
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=TENANT_FIELD,
+            field_schema=KeywordIndexParams(
+                type=KeywordIndexType.KEYWORD, is_tenant=True
+            ),
+        )
+
+    logger.debug(f"Created payload indexes on '{collection_name}': {fields}")
+
+
+def copy_collection_points(
+    client: QdrantClient,
+    source: str,
+    target: str,
+    payload: dict,
+    batch_size: int = 256,
+) -> int:
+    """
+    Copy every point (vectors and payload) from one collection into another,
+    merging `payload` into each point's payload. Returns the number of points
+    copied.
+    """
+    copied = 0
+    offset = None
+
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+
+        if points:
+            client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(
+                        id=point.id,
+                        vector=point.vector,  # type: ignore
+                        payload={**(point.payload or {}), **payload},
+                    )
+                    for point in points
+                ],
+                wait=True,
+            )
+            copied += len(points)
+
+        if offset is None:
+            return copied
+
+
+class VectorCollectionConfigError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class CollectionSpec:
+    vectors_config: VectorParams | dict[str, VectorParams]
+    payload_indexes: list[str] = field(default_factory=list)
+    quantization_config: QuantizationConfig | None = None
+    # Which models produced the vectors, stored as collection metadata
+    metadata: dict[str, str | int] = field(default_factory=dict)
+    sparse_vectors_config: dict[str, SparseVectorParams] = field(default_factory=dict)
+
+    def fingerprint(self) -> str:
+        vectors = self.vectors_config
+        if isinstance(vectors, VectorParams):
+            vectors = {"": vectors}
+
+        config: dict = {
+            "vectors": {
+                name: [params.size, params.distance]
+                for name, params in sorted(vectors.items())
+            },
+            "metadata": self.metadata,
+        }
+        if self.sparse_vectors_config:
+            config["sparse_vectors"] = {
+                name: str(params.modifier)
+                for name, params in sorted(self.sparse_vectors_config.items())
+            }
+        # Storage settings only count when set, so collections built with the
+        # defaults keep their name
+        on_disk = sorted(name for name, params in vectors.items() if params.on_disk)
+        if on_disk:
+            config["on_disk"] = on_disk
+        if self.quantization_config is not None:
+            config["quantization"] = self.quantization_config.model_dump(
+                mode="json", exclude_none=True
+            )
+        return hashlib.sha256(
+            json.dumps(config, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:8]
+
+
+class CollectionBootstrap:
+    """
+    Creates vector collections on first use and remembers them for the rest of
+    the process, so steady-state ingest and delete paths make no schema calls.
+
+    Collections are addressed through a stable alias pointing at a versioned
+    collection (`{alias}__{fingerprint}`), so they can be rebuilt and swapped
+    in atomically. Creation is serialised across processes with a Redis lock.
+    Existing collections are checked against the expected vector config the
+    first time they are seen. Collections found stale at startup are refused
+    until their alias points to a rebuilt collection.
+
+    Sparse vectors are optional: collections built before a sparse vector was
+    added to their spec keep working dense-only until they are re-indexed.
+    `has_sparse_vector` tells which ones have it. It is tracked per versioned
+    collection, so a rebuild swapped in by another process is picked up as
+    soon as the alias is resolved again.
+    """
+
+    LOCK_PREFIX = "vector_db:collection"
+    ALIAS_CACHE_SECONDS = 30
+
+    def __init__(
+        self, client: QdrantClient, redis: Redis, lock_timeout: int = 60
+    ) -> None:
+        self.client = client
+        self.redis = redis
+        self.lock_timeout = lock_timeout
+        self._known: set[str] = set()
+        self._sparse_vectors: dict[str, set[str]] = {}
+        self._targets: dict[str, tuple[str | None, float]] = {}
+        # Stale collection -> (collection it resolved to, validation error)
+        self._stale: dict[str, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def ensure(self, collection_name: str, spec: CollectionSpec) -> None:
+        if collection_name in self._known:
+            return
+
+        with self._lock:
+            if collection_name in self._known:
+                return
+
+            with self._acquire(collection_name):
+                if self.client.collection_exists(collection_name):
+                    info = self.client.get_collection(collection_name)
+                    self._validate(collection_name, info, spec)
+                else:
+                    target = self.get_versioned_name(collection_name, spec)
+                    self.create(target, spec)
+                    self._update_aliases(
+                        [
+                            CreateAliasOperation(
+                                create_alias=CreateAlias(
+                                    collection_name=target, alias_name=collection_name
+                                )
+                            )
+                        ]
+                    )
+                    self._sparse_vectors[target] = set(spec.sparse_vectors_config)
+
+            self._known.add(collection_name)
+
+    def validate(self, collection_name: str, spec: CollectionSpec) -> None:
+        """
+        Check an existing collection against `spec` without creating it, so
+        nothing is queried with vectors of a different size than it was built
+        with.
+        """
+        if collection_name in self._known:
+            return
+
+        stale = self._stale.get(collection_name)
+        if stale is not None:
+            target, message = stale
+            if (
+                self._resolve_cached(collection_name, self.ALIAS_CACHE_SECONDS)
+                == target
+            ):
+                raise VectorCollectionConfigError(message)
+
+            self._stale.pop(collection_name, None)
+
+        if not self.client.collection_exists(collection_name):
+            return
+
+        info = self.client.get_collection(collection_name)
+        self._validate(collection_name, info, spec)
+        self._known.add(collection_name)
+
+    def forget(self, collection_name: str) -> None:
+        self._known.discard(collection_name)
+        self._targets.pop(collection_name, None)
+        self._stale.pop(collection_name, None)
+
+    def has_sparse_vector(
+        self,
+        collection_name: str,
+        vector_name: str,
+        max_age: float = ALIAS_CACHE_SECONDS,
+    ) -> bool:
+        """
+        Whether the collection behind an alias has the sparse vector. The
+        alias resolution is cached for `max_age` seconds; writers pass 0 so
+        they never miss a rebuild that added the vector.
+        """
+        target = self._resolve_cached(collection_name, max_age)
+
+        if target is None:
+            return False
+
+        vectors = self._sparse_vectors.get(target)
+        if vectors is None:
+            info = self.client.get_collection(target)
+            vectors = set(info.config.params.sparse_vectors or {})
+            self._sparse_vectors[target] = vectors
+
+        return vector_name in vectors
+
+    @staticmethod
+    def get_versioned_name(alias: str, spec: CollectionSpec) -> str:
+        return f"{alias}__{spec.fingerprint()}"
+
+    def resolve(self, alias: str) -> str | None:
+        """
+        Collection an alias points to. Collections created before aliases were
+        introduced resolve to themselves.
+        """
+        aliases = self.client.get_aliases().aliases
+
+        for description in aliases:
+            if description.alias_name == alias:
+                return description.collection_name
+
+        if self.client.collection_exists(alias):
+            return alias
+
+        return None
+
+    def exists(self, alias: str) -> bool:
+        return self.resolve(alias) is not None
+
+    def create(self, collection_name: str, spec: CollectionSpec) -> None:
+        if self.client.collection_exists(collection_name):
+            return
+
+        logger.info(f"Collection '{collection_name}' does not exists, creating it")
+
+        self.client.create_collection(
+            collection_name=collection_name,
+            vectors_config=spec.vectors_config,
+            hnsw_config=get_tenant_hnsw_config(),
+            quantization_config=spec.quantization_config,
+            metadata=spec.metadata or None,
+            sparse_vectors_config=spec.sparse_vectors_config or None,
+        )
+        create_payload_indexes(self.client, collection_name, spec.payload_indexes)
+
+    def lock(self, alias: str):
+        """
+        The lock held while an alias is swapped. Writers take it while the
+        collection is being rebuilt, so no write lands in the collection that
+        is about to be replaced.
+        """
+        return self._acquire(alias)
+
+    def swap_alias(self, alias: str, target: str) -> None:
+        """
+        Point `alias` at `target` and drop the collection it pointed at before.
+        """
+        with self._acquire(alias):
+            previous = self.point_alias(alias, target)
+
+        if previous is not None:
+            self.delete_collection(previous)
+
+    def point_alias(self, alias: str, target: str) -> str | None:
+        """
+        Point `alias` at `target` without taking the lock, and return the
+        collection it pointed at before. The caller deletes that one once
+        nothing can write to it anymore.
+        """
+        previous = self.resolve(alias)
+
+        if previous == target:
+            return None
+
+        if previous == alias:
+            # A legacy collection owns the name, it has to go before the
+            # alias can be created. Queries fail until the alias exists.
+            logger.warning(f"Replacing legacy collection '{alias}' by an alias")
+            self.client.delete_collection(alias)
+            previous = None
+
+        operations: list = [
+            CreateAliasOperation(
+                create_alias=CreateAlias(collection_name=target, alias_name=alias)
+            )
+        ]
+        if previous is not None:
+            operations.insert(
+                0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias))
+            )
+
+        self._update_aliases(operations)
+        self.forget(alias)
+
+        logger.info(f"Alias '{alias}' now points to '{target}' (was '{previous}')")
+
+        return previous
+
+    def delete_collection(self, collection_name: str) -> None:
+        self.client.delete_collection(collection_name)
+        self._sparse_vectors.pop(collection_name, None)
+
+    def drop(self, alias: str) -> None:
+        """
+        Delete the collection behind an alias, and the alias with it.
+        """
+        collection_name = self.resolve(alias)
+
+        if collection_name is not None:
+            self.client.delete_collection(collection_name)
+
+        self.forget(alias)
+
+    def validate_existing(
+        self, resolve: Callable[[str], CollectionSpec | None]
+    ) -> None:
+        """
+        Validate every existing collection or alias `resolve` recognises and
+        mark it as known. Run once at startup. A mismatched collection doesn't
+        stop the process: it is logged and recorded as stale, so queries
+        refuse it until it is re-indexed.
+        """
+        aliases = {
+            description.alias_name: description.collection_name
+            for description in self.client.get_aliases().aliases
+        }
+        names = list(aliases) + [
+            collection.name for collection in self.client.get_collections().collections
+        ]
+
+        for name in names:
+            spec = resolve(name)
+            if spec is None:
+                continue
+
+            info = self.client.get_collection(name)
+            try:
+                self._validate(name, info, spec)
+            except VectorCollectionConfigError as e:
+                logger.warning(f"Stale vector collection: {e}")
+                self._stale[name] = (aliases.get(name, name), str(e))
+                continue
+
+            self._known.add(name)
+
+        logger.info(
+            f"Validated {len(self._known)} vector collections, {len(self._stale)} stale"
+        )
+
+    def _resolve_cached(self, alias: str, max_age: float) -> str | None:
+        target, resolved_at = self._targets.get(alias, (None, float("-inf")))
+
+        if time.monotonic() - resolved_at > max_age:
+            target = self.resolve(alias)
+            self._targets[alias] = (target, time.monotonic())
+
+        return target
+
+    @contextmanager
+    def _acquire(self, collection_name: str):
+        lock = self.redis.lock(
+            f"{self.LOCK_PREFIX}:{collection_name}",
+            timeout=self.lock_timeout,
+            blocking_timeout=self.lock_timeout,
+        )
+
+        try:
+            acquired = lock.acquire()
+        except RedisError as e:
+            logger.warning(f"Bootstrapping '{collection_name}' without a lock: {e}")
+            acquired = False
+
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except RedisError as e:
+                    logger.warning(
+                        f"Unable to release lock for '{collection_name}': {e}"
+                    )
+
+    def _update_aliases(self, operations: list) -> None:
+        self.client.update_collection_aliases(change_aliases_operations=operations)
+
+    @staticmethod
+    def _validate(
+        collection_name: str, info: CollectionInfo, spec: CollectionSpec
+    ) -> None:
+        actual = info.config.params.vectors
+        expected = spec.vectors_config
+
+        if isinstance(expected, VectorParams):
+            expected, actual = {"": expected}, {"": actual}
+
+        if not isinstance(actual, dict) or actual.keys() != expected.keys():
+            raise VectorCollectionConfigError(
+                f"Collection '{collection_name}' has vectors {actual}, expected {expected}"
+            )
+
+        for name, params in expected.items():
+            current: VectorParams = actual[name]  # type: ignore
+
+            if (
+                current.size != params.size
+                or current.distance != params.distance
+                or (current.multivector_config is None)
+                != (params.multivector_config is None)
+            ):
+                label = f"vector '{name}'" if name else "vectors"
+                raise VectorCollectionConfigError(
+                    f"Collection '{collection_name}' {label} are "
+                    f"{current.size}/{current.distance}, expected "
+                    f"{params.size}/{params.distance}. Re-index the collection "
+                    f"before querying it with this embedding configuration."
+                )
+
+        metadata = info.config.metadata or {}
+        for key, value in spec.metadata.items():
+            if key in metadata and metadata[key] != value:
+                raise VectorCollectionConfigError(
+                    f"Collection '{collection_name}' was built with {key} "
+                    f"'{metadata[key]}', expected '{value}'. Re-index the "
+                    f"collection before using it with this embedding configuration."
+                )
+
+
+class ReindexState:
+    """
+    Progress of a collection rebuild, kept in Redis so an interrupted rebuild
+    resumes from its last checkpoint. While a rebuild is running, ingestion
+    records the files it touches so they are re-synced before the swap.
+    """
+
+    PREFIX = "vector_db:reindex"
+
+    def __init__(self, redis: Redis, alias: str) -> None:
+        self.redis = redis
+        self.key = f"{self.PREFIX}:{alias}"
+        self.dirty_key = f"{self.key}:dirty"
+
+    def start(self, target: str) -> str | None:
+        """
+        Begin (or resume) a rebuild into `target`. Returns the checkpoint to
+        resume from, if any.
+        """
+        state = {
+            key.decode(): value.decode()
+            for key, value in self.redis.hgetall(self.key).items()  # type: ignore
+        }
+
+        if state.get("target") == target:
+            return state.get("cursor")
+
+        self.redis.delete(self.key, self.dirty_key)
+        self.redis.hset(self.key, "target", target)
+        return None
+
+    def is_running(self) -> bool:
+        try:
+            return bool(self.redis.exists(self.key))
+        except RedisError as e:
+            logger.warning(f"Unable to read re-index state {self.key}: {e}")
+            return False
+
+    def checkpoint(self, cursor: str) -> None:
+        self.redis.hset(self.key, "cursor", cursor)
+
+    def mark_dirty(self, file_ids: list[str]) -> None:
+        if len(file_ids) == 0:
+            return
+
+        try:
+            if self.redis.exists(self.key):
+                self.redis.sadd(self.dirty_key, *file_ids)
+        except RedisError as e:
+            logger.warning(f"Unable to record re-index changes for {self.key}: {e}")
+
+    def pop_dirty(self, count: int) -> list[str]:
+        file_ids = self.redis.spop(self.dirty_key, count) or []
+        return [file_id.decode() for file_id in file_ids]  # type: ignore
+
+    def finish(self) -> None:
+        self.redis.delete(self.key, self.dirty_key)
+
+
+collection_bootstrap = CollectionBootstrap(vector_db_client, redis_client)
@@ -1,12 +1,15 @@
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID
 
 from pydantic import field_validator
-from sqlmodel import Field, Relationship
+from sqlalchemy import BigInteger, Index
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlmodel import Column, Field, Relationship
 
 from src.core.security import PasswordHandler
 from src.modules.candidate.schema import CandidateBase
 from src.modules.file_storage.schema import FileBase
+from src.modules.ingestion_batch.schema import IngestionBatchBase
 from src.modules.knowledge_base.schema import KnowledgeBaseDocumentBase
 from src.modules.users.schema import UserBase
 
@@ -37,9 +40,38 @@ class File(BaseModelMixin, FileBase, table=True):
 
 
 class KnowledgeBaseDocument(BaseModelMixin, KnowledgeBaseDocumentBase, table=True):
+    __table_args__ = (
+        Index(
+            "ix_knowledgebasedocument_lsh_bands",
+            "lsh_bands",
+            postgresql_using="gin",
+        ),
+    )
+
     file_id: UUID = Field(foreign_key="file.id", nullable=False, unique=True)
     file: File = Relationship(back_populates="knowledge_base_document")
 
+    ingest_manifest: Optional[dict[str, Any]] = Field(
+        default=None, sa_column=Column(JSONB, nullable=True)
+    )
+
+    # MinHash signature and LSH bucket hashes of the content, see
+    # `src/utils/minhash.py`. Not part of API responses.
+    minhash: Optional[list[int]] = Field(
+        default=None, sa_column=Column(ARRAY(BigInteger), nullable=True), exclude=True
+    )
+    lsh_bands: Optional[list[int]] = Field(
+        default=None, sa_column=Column(ARRAY(BigInteger), nullable=True), exclude=True
+    )
+    duplicate_of_id: Optional[UUID] = Field(
+        default=None,
+        foreign_key="knowledgebasedocument.id",
+        nullable=True,
+        ondelete="SET NULL",
+    )
+    # `IngestionStatus`, not set on documents ingested before it was recorded
+    ingestion_status: Optional[str] = Field(default=None, max_length=16)
+
     candidate: Optional["Candidate"] = Relationship(
         back_populates="knowledge_base_document", cascade_delete=True
     )
@@ -75,3 +107,7 @@ class CandidateWithResume(BaseModelMixin, CandidateBase):
     knowledge_base_document_id: UUID
     knowledge_base_document: KnowledgeBaseDocument
     chunks: list[str]
+
+
+class IngestionBatch(BaseModelMixin, IngestionBatchBase, table=True):
+    owner_id: UUID = Field(foreign_key="user.id", nullable=False)
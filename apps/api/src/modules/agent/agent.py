@@ -3,7 +3,7 @@ import traceback
 from typing import Optional
 from uuid import UUID, uuid4
 
-from langchain.messages import AIMessage, AnyMessage, HumanMessage
+from langchain.messages import AIMessage, AIMessageChunk, AnyMessage, HumanMessage
 from langchain_core.runnables.config import (
     RunnableConfig,
 )
@@ -14,7 +14,6 @@ from pydantic import BaseModel
 from src.core.logger import logger
 from src.models.models import CandidateWithResume, CandidateWithScore, User
 from src.modules.candidate.controller import CandidateController
-from src.modules.file_storage.controller import FileController
 from src.modules.knowledge_base.controller import KnowledgeBaseController
 
 from .nodes.agent import AgentNode
@@ -24,24 +23,19 @@ from .nodes.citations import CitationNode
 from .nodes.parallel_retrieval import ParallelRetrievalNode
 from .nodes.resume_retrieval import ResumeRetrievalNode
 from .nodes.scope_checker import ScopeCheckerNode
+from .scope import AgentScopeFactory
 from .state import AgentState
 
 memory = MemorySaver()
 
 
 class RootAgent:
-    def __init__(self) -> None:
+    def __init__(self, scope: AgentScopeFactory) -> None:
         self.agent = None
         self.memory = memory
+        self.scope = scope
 
-    def compile(
-        self,
-        *,
-        file_controller: FileController,
-        candidate_controller: CandidateController,
-        knowledge_base_controller: KnowledgeBaseController,
-        user: User,
-    ):
+    def compile(self, *, user: User):
         if self.agent is not None:
             logger.debug("Agent already complied")
             return self.agent
@@ -53,28 +47,25 @@ class RootAgent:
         agent_builder.add_node(
             "resume_retrieval",
             ResumeRetrievalNode(
-                collection_name=KnowledgeBaseController._get_collection_name(user)
+                collection_name=KnowledgeBaseController._get_collection_name(user),
+                collection_spec=KnowledgeBaseController._get_collection_spec(),
+                user_id=user.id.hex,
             ),
         )
         agent_builder.add_node(
             "citations",
-            CitationNode(
-                file_controller=file_controller,
-                candidate_controller=candidate_controller,
-                knowledge_base_controller=knowledge_base_controller,
-            ),
+            CitationNode(scope=self.scope),
         )
         agent_builder.add_node(
             "candidate_retrieval",
             CandidateRetrievalNode(
-                collection_name=CandidateController._get_collection_name(user)
+                collection_name=CandidateController._get_collection_name(user),
+                user_id=user.id.hex,
             ),
         )
         # agent_builder.add_node("scope_checker", ScopeCheckerNode())
         agent_builder.add_node("parallel_retrieval", ParallelRetrievalNode())
-        agent_builder.add_node(
-            "agent", AgentNode(candidate_controller=candidate_controller)
-        )
+        agent_builder.add_node("agent", AgentNode(scope=self.scope))
 
         # Add Edges
         # agent_builder.add_edge(START, "scope_checker")
@@ -97,24 +88,16 @@ class RootAgent:
         self.agent = agent
         return agent
 
-    def stream(
+    async def stream(
         self,
         *,
         user: User,
         user_message: str,
-        file_controller: FileController,
-        candidate_controller: CandidateController,
-        knowledge_base_controller: KnowledgeBaseController,
         conversation_id: Optional[UUID] = None,
         candidate_id: Optional[UUID] = None,
     ):
         try:
-            agent = self.compile(
-                file_controller=file_controller,
-                candidate_controller=candidate_controller,
-                knowledge_base_controller=knowledge_base_controller,
-                user=user,
-            )
+            agent = self.compile(user=user)
 
             if conversation_id is None:
                 conversation_id = uuid4()
@@ -144,20 +127,28 @@ class RootAgent:
                 "candidate_id": candidate_id.hex if candidate_id else None,
             }
 
-            events = agent.stream(
+            # "messages" streams the LLM tokens of the chatbot and of the
+            # candidate agent's inner model calls as they are generated,
+            # "updates" the node results (the full message included)
+            events = agent.astream(
                 agent_state,
                 config=config,
-                stream_mode="updates",
+                stream_mode=["updates", "messages"],
             )
 
             yield f"event: node\ndata: __start__\n\n"
 
-            for event in events:
+            async for mode, event in events:
+                if mode == "messages":
+                    for delta in self._get_message_deltas(event):
+                        yield delta
+                    continue
+
                 for node, event_value in event.items():
                     logger.debug(f"Node Finished: {node}")
                     yield f"event: node\ndata: {node}\n\n"
 
-                    state = agent.get_state(config)
+                    state = await agent.aget_state(config)
                     if len(state.next) != 0:
                         logger.debug(f"Current Node: {state.next}")
                         yield f"event: node\ndata: {state.next[0]}\n\n"
@@ -220,3 +211,22 @@ class RootAgent:
             yield f"event: error\ndata: {e}\n\n"
         finally:
             yield "event: done\ndata: end\n\n"
+
+    @staticmethod
+    def _get_message_deltas(event: tuple[AnyMessage, dict]):
+        """
+        Token deltas of a streamed LLM call as `reason_delta` / `message_delta`
+        events. Tool messages and tool call chunks carry no answer text and
+        are skipped.
+        """
+        message, _ = event
+
+        if not isinstance(message, AIMessageChunk):
+            return
+
+        reasoning_content = message.additional_kwargs.get("reasoning_content", None)
+        if reasoning_content:
+            yield f"event: reason_delta\ndata: {json.dumps({'text': reasoning_content})}\n\n"
+
+        if message.text:
+            yield f"event: message_delta\ndata: {json.dumps({'text': message.text})}\n\n"
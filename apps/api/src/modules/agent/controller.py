@@ -2,30 +2,17 @@ from typing import Optional
 from uuid import UUID
 
 from src.models.models import User
-from src.modules.candidate.controller import CandidateController
-from src.modules.file_storage.controller import FileController
-from src.modules.knowledge_base.controller import KnowledgeBaseController
 
 from .agent import RootAgent
+from .scope import AgentScopeFactory
 
 
 class AgentController:
-    def __init__(self) -> None:
-        self.agent = RootAgent()
+    def __init__(self, scope: AgentScopeFactory) -> None:
+        self.agent = RootAgent(scope=scope)
 
-    def get_workflow(
-        self,
-        file_controller: FileController,
-        candidate_controller: CandidateController,
-        knowledge_base_controller: KnowledgeBaseController,
-        user: User,
-    ):
-        agent = self.agent.compile(
-            file_controller=file_controller,
-            candidate_controller=candidate_controller,
-            knowledge_base_controller=knowledge_base_controller,
-            user=user,
-        )
+    def get_workflow(self, user: User):
+        agent = self.agent.compile(user=user)
         mermaid = agent.get_graph(xray=True).draw_mermaid()
         state = agent.get_graph(xray=True).to_json()
 
@@ -36,9 +23,6 @@ class AgentController:
         user: User,
         user_message: str,
         *,
-        file_controller: FileController,
-        candidate_controller: CandidateController,
-        knowledge_base_controller: KnowledgeBaseController,
         conversation_id: Optional[UUID] = None,
         candidate_id: Optional[UUID] = None,
     ):
@@ -47,7 +31,4 @@ class AgentController:
             user_message=user_message,
             conversation_id=conversation_id,
             candidate_id=candidate_id,
-            file_controller=file_controller,
-            candidate_controller=candidate_controller,
-            knowledge_base_controller=knowledge_base_controller,
         )
@@ -1,3 +1,4 @@
+import asyncio
 from uuid import UUID, uuid4
 
 from langchain.agents import create_agent
@@ -11,6 +12,7 @@ from src.modules.llm_models.model import LlmModelFactory
 from src.utils.resume_parser import CandidateExperience
 from src.utils.time import utcnow
 
+from ..scope import AgentScopeFactory
 from ..state import AgentState
 from .calendar_tool import check_candidate_calendar
 from .email_tool import send_email
@@ -19,13 +21,13 @@ memory = InMemorySaver()
 
 
 class AgentNode:
-    def __init__(self, candidate_controller: CandidateController) -> None:
-        self.candidate_controller = candidate_controller
+    def __init__(self, scope: AgentScopeFactory) -> None:
+        self.scope = scope
         self.model_factory = LlmModelFactory()
         self.llm = self.model_factory.get_model()
         self.tools = [send_email, check_candidate_calendar]
 
-    def __call__(self, state: AgentState, config: RunnableConfig):
+    async def __call__(self, state: AgentState, config: RunnableConfig):
         candidate_id = (
             UUID(state["candidate_id"]) if state["candidate_id"] is not None else None
         )
@@ -33,21 +35,12 @@ class AgentNode:
         if candidate_id is None:
             raise NotFoundException("No candidate found")
 
-        candidate = self.candidate_controller.get_by_id(candidate_id)
+        candidate_details = await asyncio.to_thread(
+            self._get_candidate_details, candidate_id
+        )
 
         logger.debug(f"Selected candidate: {candidate_id}")
 
-        experiences = [CandidateExperience(**exp) for exp in candidate.experiences]
-        candidate_details = (
-            f"Name: {candidate.name}\n"
-            f"Email: {candidate.email}\n"
-            f"Contact: {candidate.contact}\n"
-            f"Years of experience: {candidate.years_of_experience}\n"
-            f"Skills: {', '.join(candidate.skills)}\n"
-            f"Certifications: {', '.join(candidate.certifications)}\n"
-            f"Experiences: {'\n'.join(CandidateController._get_experience_texts(experiences))}\n"
-        )
-
         system_prompt = f"""
         You are an expert in recruitment.
         You will be given a candidate's details.
@@ -68,9 +61,23 @@ class AgentNode:
 
         thread_id = config.get("configurable", {}).get("thread_id", uuid4())
 
-        response = agent.invoke(
+        response = await agent.ainvoke(
             {"messages": [{"role": "user", "content": state["messages"][-1].content}]},
             {"configurable": {"thread_id": thread_id}},
         )
         output = response["messages"][-1]
         return {"messages": [output]}
+
+    def _get_candidate_details(self, candidate_id: UUID) -> str:
+        with self.scope() as scope:
+            candidate = scope.candidate_controller.get_by_id(candidate_id)
+            experiences = [CandidateExperience(**exp) for exp in candidate.experiences]
+            return (
+                f"Name: {candidate.name}\n"
+                f"Email: {candidate.email}\n"
+                f"Contact: {candidate.contact}\n"
+                f"Years of experience: {candidate.years_of_experience}\n"
+                f"Skills: {', '.join(candidate.skills)}\n"
+                f"Certifications: {', '.join(candidate.certifications)}\n"
+                f"Experiences: {'\n'.join(CandidateController._get_experience_texts(experiences))}\n"
+            )
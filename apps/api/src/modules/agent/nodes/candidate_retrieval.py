@@ -1,30 +1,41 @@
+import asyncio
+
 from langchain_core.runnables import RunnableConfig
-from qdrant_client.models import Document, Prefetch
+from qdrant_client.models import Prefetch
 
 from src.core.logger import logger
-from src.core.vector_db import vector_db_client
+from src.core.vector_db import async_vector_db_client, get_tenant_filter
+from src.modules.llm_models.inference import inference_service
 
 from ..state import AgentState
 
 
 class CandidateRetrievalNode:
-    def __init__(self, collection_name: str):
-        self.vector_db = vector_db_client
+    def __init__(self, collection_name: str, user_id: str):
+        self.vector_db = async_vector_db_client
         self.collection_name = collection_name
+        self.query_filter = get_tenant_filter(user_id)
+        self.inference = inference_service
+
+    async def __call__(self, state: AgentState, config: RunnableConfig):
+        query = str(state["messages"][-1].content)
+        dense_query, colbert_query = await asyncio.gather(
+            self.inference.aembed_dense_query(query),
+            self.inference.aembed_colbert_query(query),
+        )
 
-    def __call__(self, state: AgentState, config: RunnableConfig):
-        query = state["messages"][-1].content
-
-        results = self.vector_db.query_points(
+        response = await self.vector_db.query_points(
             collection_name=self.collection_name,
             prefetch=Prefetch(
-                query=Document(text=str(query), model="BAAI/bge-small-en"),
+                query=dense_query.tolist(),
                 using="dense",
             ),
-            query=Document(text=str(query), model="colbert-ir/colbertv2.0"),
+            query=colbert_query.tolist(),
             using="colbert",
+            query_filter=self.query_filter,
             limit=5,
-        ).points
+        )
+        results = response.points
 
         logger.debug(
             f"Candidates retrieved from vector store is {len(results)} for query: {query}"
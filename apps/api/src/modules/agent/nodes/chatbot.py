@@ -14,7 +14,7 @@ class ChatBotNode:
         self.llm = self.model_factory.get_model()
         self.llm = self.llm.bind_tools([])
 
-    def __call__(self, state: AgentState):
+    async def __call__(self, state: AgentState):
         resume_candidates = state["resume_candidates"]
         candidates = state["candidates"]
         retrieved_texts = ""
@@ -61,7 +61,7 @@ class ChatBotNode:
 
         logger.debug(f"Messages already in state: {len(state['messages'])}")
 
-        response = self.llm.invoke(
+        response = await self.llm.ainvoke(
             [SystemMessage(content=system_prompt)] + state["messages"]
         )
         return {"messages": [response]}
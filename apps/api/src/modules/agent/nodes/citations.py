@@ -7,23 +7,14 @@ from qdrant_client.models import ScoredPoint
 from src.core.exception import NotFoundException
 from src.core.logger import logger
 from src.models.models import CandidateWithResume, CandidateWithScore, File
-from src.modules.candidate.controller import CandidateController
-from src.modules.file_storage.controller import FileController
-from src.modules.knowledge_base.controller import KnowledgeBaseController
 
+from ..scope import AgentScope, AgentScopeFactory
 from ..state import AgentState
 
 
 class CitationNode:
-    def __init__(
-        self,
-        file_controller: FileController,
-        candidate_controller: CandidateController,
-        knowledge_base_controller: KnowledgeBaseController,
-    ) -> None:
-        self.file_controller = file_controller
-        self.candidate_controller = candidate_controller
-        self.knowledge_base_controller = knowledge_base_controller
+    def __init__(self, scope: AgentScopeFactory) -> None:
+        self.scope = scope
 
     def __call__(self, state: AgentState, config: RunnableConfig):
         metadata = config.get("metadata", {})
@@ -40,11 +31,12 @@ class CitationNode:
         if not user_id:
             raise NotFoundException("User not found")
 
-        files, resume_candidates = self._get_resume_candidates(
-            user_id, resume_retrieved_points
-        )
+        with self.scope() as scope:
+            files, resume_candidates = self._get_resume_candidates(
+                scope, user_id, resume_retrieved_points
+            )
 
-        candidates = self._get_candidates(candidate_retrieved_points)
+            candidates = self._get_candidates(scope, candidate_retrieved_points)
 
         logger.debug(f"From Resumes found {len(resume_candidates)} candidates")
         logger.debug(f"From Candidates found {len(candidates)} candidates")
@@ -56,7 +48,10 @@ class CitationNode:
         }
 
     def _get_resume_candidates(
-        self, user_id: UUID, resume_retrieved_points: list[ScoredPoint] | None
+        self,
+        scope: AgentScope,
+        user_id: UUID,
+        resume_retrieved_points: list[ScoredPoint] | None,
     ) -> Tuple[list[File], list[CandidateWithResume]]:
         if resume_retrieved_points is None:
             return [], []
@@ -83,7 +78,7 @@ class CitationNode:
                 f"{point.payload['knowledge_base_document_id']} point {point.score}"
             )
 
-        files = self.file_controller.get_files_by_ids(
+        files = scope.file_controller.get_files_by_ids(
             ids=list(document_ids),
             user_id=user_id,
         )
@@ -91,10 +86,10 @@ class CitationNode:
         resume_candidates: list[CandidateWithResume] = []
 
         for doc_id in knowledge_base_ids.keys():
-            candidate = self.candidate_controller.repository.get_by_knowledge_base_id(
+            candidate = scope.candidate_controller.repository.get_by_knowledge_base_id(
                 UUID(doc_id)
             )
-            knowledge_base_document = self.knowledge_base_controller.get_by_id(
+            knowledge_base_document = scope.knowledge_base_controller.get_by_id(
                 UUID(doc_id)
             )
 
@@ -111,7 +106,11 @@ class CitationNode:
 
         return files, resume_candidates
 
-    def _get_candidates(self, candidate_retrieved_points: list[ScoredPoint] | None):
+    def _get_candidates(
+        self,
+        scope: AgentScope,
+        candidate_retrieved_points: list[ScoredPoint] | None,
+    ):
         if candidate_retrieved_points is None:
             return []
 
@@ -134,7 +133,7 @@ class CitationNode:
         candidates: list[CandidateWithScore] = []
 
         for candidate_id in candidate_ids:
-            candidate = self.candidate_controller.get_by_id(UUID(candidate_id))
+            candidate = scope.candidate_controller.get_by_id(UUID(candidate_id))
             candidates.append(
                 CandidateWithScore(
                     **candidate.model_dump(),
@@ -1,31 +1,63 @@
-from fastembed.rerank.cross_encoder import TextCrossEncoder
+import asyncio
+import time
+
 from langchain_core.runnables import RunnableConfig
+from qdrant_client.models import (
+    Fusion,
+    FusionQuery,
+    Prefetch,
+    Rrf,
+    RrfQuery,
+    SparseVector,
+)
 
+from src.core.config import settings
 from src.core.logger import logger
-from src.core.vector_db import vector_db_client
-from src.modules.llm_models.embedding import create_embedding
+from src.core.vector_db import (
+    CollectionSpec,
+    async_vector_db_client,
+    collection_bootstrap,
+    get_quantization_search_params,
+    get_tenant_filter,
+)
+from src.modules.knowledge_base.controller import SPARSE_VECTOR_NAME
+from src.modules.llm_models.inference import inference_service
+from src.modules.llm_models.rerank import reranker
 
 from ..state import AgentState
 
 
 class ResumeRetrievalNode:
-    def __init__(self, collection_name: str):
-        self.vector_db = vector_db_client
-        self.create_embedding = create_embedding
+    def __init__(
+        self, collection_name: str, collection_spec: CollectionSpec, user_id: str
+    ):
+        self.vector_db = async_vector_db_client
+        self.collections = collection_bootstrap
         self.collection_name = collection_name
-        self.reranker = TextCrossEncoder(
-            model_name="jinaai/jina-reranker-v2-base-multilingual"
-        )
+        self.collection_spec = collection_spec
+        self.query_filter = get_tenant_filter(user_id)
+        self.search_params = get_quantization_search_params()
+        self.inference = inference_service
+        self.reranker = reranker
 
-    def __call__(self, state: AgentState, config: RunnableConfig):
+    async def __call__(self, state: AgentState, config: RunnableConfig):
         query = state["messages"][-1].content
-        query_embedding = self.create_embedding(input=str(query))
+        deadline = self._get_deadline(config)
 
-        results = self.vector_db.search(
-            collection_name=self.collection_name,
-            query_vector=query_embedding.data[0].embedding,
-            limit=5,
-        )
+        hybrid = await asyncio.to_thread(self._check_collection)
+        query_embedding = await self.inference.aembed_query(str(query))
+
+        if hybrid:
+            results = await self._hybrid_search(str(query), query_embedding.tolist())
+        else:
+            response = await self.vector_db.query_points(
+                collection_name=self.collection_name,
+                query=query_embedding.tolist(),
+                query_filter=self.query_filter,
+                search_params=self.search_params,
+                limit=settings.RESUME_RETRIEVAL_CANDIDATES,
+            )
+            results = response.points
 
         logger.debug(
             f"Resumes retrieved from vector store is {len(results)} for query: {query}"
@@ -35,10 +67,85 @@ class ResumeRetrievalNode:
         for i, hit in enumerate(results):
             resume_chunks.append(hit.payload["text"])  # type: ignore
 
-        new_scores = list(self.reranker.rerank(str(query), resume_chunks))
-        ranking = [(i, score) for i, score in enumerate(new_scores)]
-        ranking.sort(key=lambda x: x[1], reverse=True)
+        ranking = await self.reranker.arerank(
+            str(query),
+            resume_chunks,
+            limit=settings.RESUME_RETRIEVAL_LIMIT,
+            deadline=deadline,
+        )
 
-        sorted_results = [results[idx] for idx, _ in ranking]
+        sorted_results = [results[idx] for idx in ranking]
 
         return {"resume_retrieved_points": sorted_results}
+
+    def _check_collection(self) -> bool:
+        """
+        Refuse to search a collection embedded with another dimension, and
+        tell whether it has the BM25 vector for hybrid search.
+        """
+        self.collections.validate(self.collection_name, self.collection_spec)
+        return self.collections.has_sparse_vector(
+            self.collection_name, SPARSE_VECTOR_NAME
+        )
+
+    @staticmethod
+    def _get_deadline(config: RunnableConfig) -> float | None:
+        """
+        The reranking budget covers the whole node, retrieval included. It can
+        be set per request with `rerank_budget_ms` in the configurable.
+        """
+        budget = config.get("configurable", {}).get(
+            "rerank_budget_ms", settings.RESUME_RERANK_BUDGET_MS
+        )
+
+        if budget is None:
+            return None
+
+        return time.perf_counter() + budget / 1000
+
+    async def _hybrid_search(self, query: str, dense_query: list[float]):
+        """
+        Dense and BM25 prefetches fused server-side in one request, so exact
+        terms like skill names are found even when the embedding misses them.
+        """
+        sparse_query = await self.inference.aembed_sparse_query(query)
+
+        response = await self.vector_db.query_points(
+            collection_name=self.collection_name,
+            prefetch=[
+                Prefetch(
+                    query=dense_query,
+                    filter=self.query_filter,
+                    params=self.search_params,
+                    limit=settings.RESUME_RETRIEVAL_DENSE_PREFETCH,
+                ),
+                Prefetch(
+                    query=SparseVector(
+                        indices=sparse_query.indices.tolist(),
+                        values=sparse_query.values.tolist(),
+                    ),
+                    using=SPARSE_VECTOR_NAME,
+                    filter=self.query_filter,
+                    limit=settings.RESUME_RETRIEVAL_SPARSE_PREFETCH,
+                ),
+            ],
+            query=self._get_fusion_query(),
+            query_filter=self.query_filter,
+            limit=settings.RESUME_RETRIEVAL_CANDIDATES,
+        )
+
+        return response.points
+
+    @staticmethod
+    def _get_fusion_query():
+        if settings.RESUME_RETRIEVAL_FUSION == "dbsf":
+            return FusionQuery(fusion=Fusion.DBSF)
+
+        weights = [
+            settings.RESUME_RETRIEVAL_DENSE_WEIGHT,
+            settings.RESUME_RETRIEVAL_SPARSE_WEIGHT,
+        ]
+        if weights[0] == weights[1]:
+            return FusionQuery(fusion=Fusion.RRF)
+
+        return RrfQuery(rrf=Rrf(weights=weights))
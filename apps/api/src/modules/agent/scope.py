@@ -0,0 +1,23 @@
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from typing import Callable
+
+from src.modules.candidate.controller import CandidateController
+from src.modules.file_storage.controller import FileController
+from src.modules.knowledge_base.controller import KnowledgeBaseController
+
+
+@dataclass
+class AgentScope:
+    """
+    Controllers sharing one short-lived database session. Nodes open a scope
+    for the queries they run instead of holding the request's session, so an
+    open chat stream only uses a pooled connection while a node needs it.
+    """
+
+    file_controller: FileController
+    candidate_controller: CandidateController
+    knowledge_base_controller: KnowledgeBaseController
+
+
+type AgentScopeFactory = Callable[[], AbstractContextManager[AgentScope]]
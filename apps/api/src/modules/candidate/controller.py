@@ -1,11 +1,10 @@
+import re
 from uuid import UUID, uuid4
 
-from fastembed import LateInteractionTextEmbedding, TextEmbedding
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
-    Document,
     FieldCondition,
     Filter,
     HnswConfigDiff,
@@ -16,13 +15,26 @@ from qdrant_client.models import (
     VectorParams,
 )
 
+from src.core.config import settings
 from src.core.controller.base import BaseController
 from src.core.logger import logger
+from src.core.vector_db import (
+    CollectionSpec,
+    collection_bootstrap,
+    copy_collection_points,
+)
 from src.models.models import Candidate, File, KnowledgeBaseDocument, User
+from src.modules.llm_models.registry import (
+    COLBERT_EMBEDDING_MODEL,
+    DENSE_EMBEDDING_MODEL,
+    model_registry,
+)
 from src.utils.resume_parser import CandidateExperience
 
 from .repository import CandidateRepository
 
+USER_COLLECTION_PATTERN = re.compile(r".+_candidate_[0-9a-f]{32}")
+
 
 class CandidateController(BaseController[Candidate]):
     def __init__(
@@ -31,10 +43,6 @@ class CandidateController(BaseController[Candidate]):
         super().__init__(model=Candidate, repository=repository)
         self.repository = repository
         self.vector_db = vector_db
-        self.colbert_embedding_model = LateInteractionTextEmbedding(
-            "colbert-ir/colbertv2.0"
-        )
-        self.dense_embedding_model = TextEmbedding("BAAI/bge-small-en")
 
     def get_candidates(self, user: User):
         statement = (
@@ -49,34 +57,49 @@ class CandidateController(BaseController[Candidate]):
         return list(candidates)
 
     @staticmethod
-    def _get_collection_name(user: User):
+    def _get_user_collection_name(user: User):
         return f"{user.first_name}_candidate_{user.id.hex}"
 
-    def _initialize_vector_collection(self, collection_name: str):
-        does_exists = self.vector_db.collection_exists(collection_name)
-
-        if does_exists:
-            logger.debug(f"Collection '{collection_name}' already exists")
-        else:
-            logger.debug(f"Collection '{collection_name}' does not exists.")
-
-            self.vector_db.create_collection(
-                collection_name=collection_name,
-                vectors_config={
-                    "dense": VectorParams(
-                        size=384,
-                        distance=Distance.COSINE,
-                    ),
-                    "colbert": VectorParams(
-                        size=128,
-                        distance=Distance.COSINE,
-                        multivector_config=MultiVectorConfig(
-                            comparator=MultiVectorComparator.MAX_SIM
-                        ),
-                        hnsw_config=HnswConfigDiff(m=0),
+    @staticmethod
+    def _get_collection_name(user: User):
+        if settings.VECTOR_DB_MULTITENANT:
+            return settings.VECTOR_DB_CANDIDATE_COLLECTION
+
+        return CandidateController._get_user_collection_name(user)
+
+    @staticmethod
+    def _get_collection_spec():
+        return CollectionSpec(
+            vectors_config={
+                "dense": VectorParams(
+                    size=384,
+                    distance=Distance.COSINE,
+                ),
+                "colbert": VectorParams(
+                    size=128,
+                    distance=Distance.COSINE,
+                    multivector_config=MultiVectorConfig(
+                        comparator=MultiVectorComparator.MAX_SIM
                     ),
-                },
-            )
+                    hnsw_config=HnswConfigDiff(m=0),
+                ),
+            },
+            payload_indexes=["candidate_id"],
+            metadata={
+                "dense_model": DENSE_EMBEDDING_MODEL,
+                "colbert_model": COLBERT_EMBEDDING_MODEL,
+            },
+        )
+
+    @staticmethod
+    def _is_collection_name(name: str):
+        if settings.VECTOR_DB_MULTITENANT:
+            return name == settings.VECTOR_DB_CANDIDATE_COLLECTION
+
+        return USER_COLLECTION_PATTERN.fullmatch(name) is not None
+
+    def _initialize_vector_collection(self, collection_name: str):
+        collection_bootstrap.ensure(collection_name, self._get_collection_spec())
 
     def _get_count_of_points_from_collection(
         self, candidate_id: str, collection_name: str
@@ -150,30 +173,53 @@ class CandidateController(BaseController[Candidate]):
         )
         texts = text_splitter.split_text(candidate_text)
 
-        dense_documents = [
-            Document(text=doc, model="BAAI/bge-small-en") for doc in texts
-        ]
-        colbert_documents = [
-            Document(text=doc, model="colbert-ir/colbertv2.0") for doc in texts
-        ]
+        dense_embeddings = list(model_registry.dense_embedding.embed(texts))
+        colbert_embeddings = list(model_registry.colbert_embedding.embed(texts))
 
-        # for _, colbert in enumerate(colbert_embeddings):
         self.vector_db.upload_points(
             collection_name=collection_name,
             points=[
                 PointStruct(
                     id=uuid4().hex,
-                    payload={"candidate_id": candidate.id.hex, "text": texts[i]},
+                    payload={
+                        "candidate_id": candidate.id.hex,
+                        "user_id": user.id.hex,
+                        "text": texts[i],
+                    },
                     vector={
-                        "dense": dense_documents[i],
-                        "colbert": colbert_documents[i],
-                    },  # type: ignore
+                        "dense": dense_embeddings[i].tolist(),
+                        "colbert": colbert_embeddings[i].tolist(),
+                    },
                 )
                 for i in range(len(texts))
             ],
             batch_size=8,
         )
 
+    def migrate_to_shared_collection(self, user: User, delete_source: bool = False):
+        """
+        Copy the user's legacy per-user collection into the shared collection,
+        tagging every point with the user's id.
+        """
+        source = self._get_user_collection_name(user)
+        target = settings.VECTOR_DB_CANDIDATE_COLLECTION
+
+        if not collection_bootstrap.exists(source):
+            logger.debug(f"No candidate collection to migrate for user: {user.id}")
+            return 0
+
+        self._initialize_vector_collection(target)
+        copied = copy_collection_points(
+            self.vector_db, source, target, payload={"user_id": user.id.hex}
+        )
+
+        logger.info(f'Migrated {copied} points from "{source}" to "{target}"')
+
+        if delete_source:
+            collection_bootstrap.drop(source)
+
+        return copied
+
     @staticmethod
     def _get_experience_texts(experiences: list[CandidateExperience]):
         texts = []
@@ -8,7 +8,8 @@ from sqlmodel import Column, Field, SQLModel
 
 
 class CandidateBase(SQLModel):
-    email: EmailStr = Field(unique=True, index=True, max_length=255)
+    # Not unique: different owners can upload the same candidate
+    email: EmailStr = Field(index=True, max_length=255)
     name: str = Field(min_length=1)
     contact: Optional[str] = Field(default=None, nullable=True)
     years_of_experience: float = Field(default=0)
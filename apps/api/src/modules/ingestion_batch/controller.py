@@ -0,0 +1,30 @@
+from uuid import UUID
+
+from src.core.controller.base import BaseController
+from src.core.exception import NotFoundException
+from src.models.models import IngestionBatch, User
+
+from .repository import IngestionBatchRepository
+from .schema import IngestionBatchCreate
+
+
+class IngestionBatchController(BaseController[IngestionBatch]):
+    def __init__(self, repository: IngestionBatchRepository) -> None:
+        super().__init__(model=IngestionBatch, repository=repository)
+        self.repository = repository
+
+    def create_batch(self, user: User, total: int) -> IngestionBatch:
+        return self.create(IngestionBatchCreate(owner_id=user.id, total=total))
+
+    def get_batch(self, id: UUID, user: User) -> IngestionBatch:
+        batch = self.repository.session.exec(
+            self.repository._query().where(
+                self.model_class.id == id,
+                self.model_class.owner_id == user.id,
+            )
+        ).one_or_none()
+
+        if batch is None:
+            raise NotFoundException(f"No ingestion batch exists with id: {id}")
+
+        return batch
@@ -0,0 +1,24 @@
+from uuid import UUID
+
+from sqlalchemy import update
+
+from src.core.repository.base import BaseRepository
+from src.models.models import IngestionBatch
+
+
+class IngestionBatchRepository(BaseRepository[IngestionBatch]):
+    def increment(self, id: UUID, *, done: int = 0, failed: int = 0) -> None:
+        """
+        Atomically bump the batch counters, so concurrent workers never
+        overwrite each other's progress.
+        """
+        statement = (
+            update(self.model_class)
+            .where(self.model_class.id == id)  # type: ignore
+            .values(
+                done=self.model_class.done + done,
+                failed=self.model_class.failed + failed,
+            )
+        )
+        self.session.exec(statement)  # type: ignore
+        self.session.commit()
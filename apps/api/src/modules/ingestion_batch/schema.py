@@ -0,0 +1,44 @@
+from typing import Literal, Optional
+from uuid import UUID
+
+from pydantic import computed_field
+from sqlmodel import Field, SQLModel
+
+from src.models.mixins import BaseModelMixin
+
+type IngestionBatchStatus = Literal["PROGRESS", "SUCCESS", "FAILURE", "PARTIAL"]
+
+
+class IngestionBatchBase(SQLModel):
+    total: int = Field(default=0, ge=0)
+    done: int = Field(default=0, ge=0)
+    failed: int = Field(default=0, ge=0)
+    task_id: Optional[str] = Field(default=None)
+
+
+class IngestionBatchCreate(IngestionBatchBase):
+    owner_id: UUID
+
+
+class IngestionBatchPublic(BaseModelMixin, IngestionBatchBase):
+    owner_id: UUID
+
+    @computed_field
+    @property
+    def in_flight(self) -> int:
+        return max(self.total - self.done - self.failed, 0)
+
+    @computed_field
+    @property
+    def status(self) -> IngestionBatchStatus:
+        if self.in_flight > 0:
+            return "PROGRESS"
+        if self.failed == 0:
+            return "SUCCESS"
+        if self.done == 0:
+            return "FAILURE"
+        return "PARTIAL"
+
+
+class BatchExtractionRequest(SQLModel):
+    file_ids: list[UUID] = Field(min_length=1)
@@ -1,5 +1,9 @@
-from uuid import UUID, uuid4
+import re
+import time
+from contextlib import contextmanager
+from uuid import UUID, uuid5
 
+import numpy as np
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
@@ -7,27 +11,64 @@ from qdrant_client.models import (
     FieldCondition,
     Filter,
     MatchValue,
-    PointStruct,
+    Modifier,
+    PointIdsList,
+    SetPayload,
+    SetPayloadOperation,
+    SparseVector,
+    SparseVectorParams,
     VectorParams,
 )
+from redis.exceptions import RedisError
 
-from celery import chain
+from celery import chain, chord, group
 from src.celery.tasks import app as celery_app
 from src.celery.tasks import (
     create_candidate,
     create_candidate_embeddings,
     parse_document,
+    publish_ingestion_failure,
+    store_batch_embeddings,
     store_embeddings,
 )
 from src.celery.utils import get_celery_task_status
+from src.core.config import settings
 from src.core.controller.base import BaseController
 from src.core.exception import BadRequestException, NotFoundException
 from src.core.logger import logger
+from src.core.redis import redis_client
+from src.core.vector_db import (
+    CollectionSpec,
+    ReindexState,
+    collection_bootstrap,
+    copy_collection_points,
+    get_quantization_config,
+)
 from src.models.models import File, KnowledgeBaseDocument, User
 from src.modules.candidate.controller import CandidateController
-from src.modules.llm_models.embedding import create_embedding, get_embedding_size
+from src.modules.ingestion_batch.controller import IngestionBatchController
+from src.modules.llm_models.embedding import (
+    embed_texts,
+    get_embedding_model_name,
+    get_embedding_size,
+    get_native_embedding_size,
+)
+from src.modules.llm_models.registry import SPARSE_EMBEDDING_MODEL, model_registry
+from src.utils.minhash import get_bands, get_clusters, get_signature, get_similarity
 
+from .progress import ingestion_progress
 from .repository import KnowledgeBaseDocumentRepository
+from .schema import (
+    DuplicateCluster,
+    DuplicateDocument,
+    IngestManifest,
+    NearDuplicate,
+    hash_text,
+)
+
+USER_COLLECTION_PATTERN = re.compile(r".+_[0-9a-f]{32}")
+DEDUP_LOCK = "knowledge_base:dedup"
+SPARSE_VECTOR_NAME = "bm25"
 
 
 class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
@@ -45,11 +86,12 @@ class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
         knowledge_base_document = self.repository.upsert_by_file(document.id)
 
         workflow = chain(
-            parse_document.s(document.filename, document.id),  # type: ignore
-            store_embeddings.s(document.id, user.id),  # type: ignore
+            parse_document.s(document.filename, document.id, user_id=user.id),  # type: ignore
+            store_embeddings.s(user.id),  # type: ignore
             create_candidate.s(),  # type: ignore
             create_candidate_embeddings.s(user.id),  # type: ignore
         )
+        workflow.link_error(publish_ingestion_failure.si(document.id, user.id))  # type: ignore
         task = workflow.apply_async()
 
         result = get_celery_task_status(task_id=task.id)  # type: ignore
@@ -60,6 +102,40 @@ class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
         )
         return knowledge_base_document
 
+    def enqueue_documents(
+        self,
+        *,
+        user: User,
+        documents: list[File],
+        ingestion_batch_controller: IngestionBatchController,
+    ):
+        """
+        Fan out extraction of many documents. Every chunk of documents is a
+        chord: the documents are parsed in parallel, then embedded together,
+        then a candidate is created for each of them. Progress is tracked on
+        a single `IngestionBatch` row.
+        """
+        batch = ingestion_batch_controller.create_batch(user=user, total=len(documents))
+
+        chunk_size = settings.INGESTION_BATCH_CHUNK_SIZE
+        workflow = group(
+            chord(
+                [
+                    parse_document.s(  # type: ignore
+                        document.filename, document.id, batch.id, user.id
+                    )
+                    for document in documents[start : start + chunk_size]
+                ],
+                store_batch_embeddings.s(user.id, batch.id),  # type: ignore
+            )
+            for start in range(0, len(documents), chunk_size)
+        )
+        task = workflow.apply_async()
+
+        return ingestion_batch_controller.repository.update(
+            batch.id, {"task_id": task.id}
+        )
+
     def get_task_status(self, id: str):
         result = get_celery_task_status(id)
         knowledge_base_document = self.repository.get_by_task_id(result.task_id)
@@ -72,26 +148,84 @@ class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
             )
         return knowledge_base_document
 
-    def _initialize_vector_collection(self, collection_name: str):
-        does_exists = self.vector_db.collection_exists(collection_name)
+    @staticmethod
+    def _get_collection_spec():
+        return CollectionSpec(
+            vectors_config=VectorParams(
+                size=get_embedding_size(),
+                distance=Distance.COSINE,
+                on_disk=settings.VECTOR_DB_ON_DISK,
+            ),
+            payload_indexes=["file_id", "knowledge_base_document_id"],
+            quantization_config=get_quantization_config(),
+            metadata={
+                "embedding_model": get_embedding_model_name(),
+                "dimension": get_embedding_size(),
+                "sparse_model": SPARSE_EMBEDDING_MODEL,
+            },
+            sparse_vectors_config={
+                SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)
+            },
+        )
 
-        if does_exists:
-            logger.info(f"Collection '{collection_name}' already exists")
-        else:
-            logger.info(f"Collection '{collection_name}' does not exists.")
+    @staticmethod
+    def _is_collection_name(name: str):
+        if settings.VECTOR_DB_MULTITENANT:
+            return name == settings.VECTOR_DB_KNOWLEDGE_BASE_COLLECTION
 
-            self.vector_db.create_collection(
-                collection_name=collection_name,
-                vectors_config=VectorParams(
-                    size=get_embedding_size(), distance=Distance.COSINE
-                ),
-            )
+        return USER_COLLECTION_PATTERN.fullmatch(name) is not None
+
+    def _initialize_vector_collection(self, collection_name: str):
+        collection_bootstrap.ensure(collection_name, self._get_collection_spec())
 
     @staticmethod
-    def _get_collection_name(user: User):
+    def _get_user_collection_name(user: User):
         return f"{user.first_name}_{user.id.hex}"
 
-    def ingest_documents(self, user: User, files: list[File]):
+    @staticmethod
+    def _get_collection_name(user: User):
+        if settings.VECTOR_DB_MULTITENANT:
+            return settings.VECTOR_DB_KNOWLEDGE_BASE_COLLECTION
+
+        return KnowledgeBaseController._get_user_collection_name(user)
+
+    def migrate_to_shared_collection(self, user: User, delete_source: bool = False):
+        """
+        Copy the user's legacy per-user collection into the shared collection,
+        tagging every point with the user's id. Point ids are kept, so running
+        the migration again is idempotent.
+        """
+        source = self._get_user_collection_name(user)
+        target = settings.VECTOR_DB_KNOWLEDGE_BASE_COLLECTION
+
+        if not collection_bootstrap.exists(source):
+            logger.debug(f"No knowledge base collection to migrate for user: {user.id}")
+            return 0
+
+        self._initialize_vector_collection(target)
+        copied = copy_collection_points(
+            self.vector_db, source, target, payload={"user_id": user.id.hex}
+        )
+
+        logger.info(f'Migrated {copied} points from "{source}" to "{target}"')
+
+        if delete_source:
+            collection_bootstrap.drop(source)
+
+        return copied
+
+    def ingest_documents(self, user: User, files: list[File], force: bool = False):
+        """
+        Chunk, embed and upload documents into the user's collection.
+
+        In incremental mode (`INGESTION_INCREMENTAL`) every chunk is hashed and
+        compared against the document's ingest manifest: only new chunks are
+        embedded and upserted, and vanished chunks are deleted. Points are
+        keyed by chunk hash, so chunks that only moved are kept. A document
+        whose content is unchanged is skipped, one ingested with another
+        chunking, model or collection is replaced. `force` re-ingests
+        everything.
+        """
         for doc in files:
             if not doc.knowledge_base_document:
                 raise BadRequestException(
@@ -104,43 +238,467 @@ class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
                 )
 
         collection_name = self._get_collection_name(user)
+
+        if self._defer_to_reindex(collection_name, [doc.id.hex for doc in files]):
+            return files
+
         self._initialize_vector_collection(collection_name)
 
+        ids: list[str] = []
+        texts: list[str] = []
+        payloads: list[dict] = []
+        stale_ids: list[str] = []
+        moved: dict[str, int] = {}
+        replaced_file_ids: list[str] = []
+        manifests: dict[UUID, IngestManifest] = {}
+
         for doc in files:
-            if doc.knowledge_base_document and doc.knowledge_base_document.content:
-                text_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=get_embedding_size(),
-                    chunk_overlap=256,
+            document = doc.knowledge_base_document
+
+            if document is None or not document.content:
+                continue
+
+            incremental = settings.INGESTION_INCREMENTAL and not force
+            previous = (
+                IngestManifest.model_validate(document.ingest_manifest)
+                if incremental and document.ingest_manifest
+                else None
+            )
+            chunks, manifest = self._chunk_document(document.content, collection_name)
+            keys = manifest.get_chunk_keys()
+
+            if incremental and manifest.is_unchanged(previous):
+                logger.debug(f"Document {document.id} is unchanged, skipping")
+                continue
+
+            manifests[document.id] = manifest
+
+            if manifest.is_compatible(previous):
+                changed, moved_indexes, vanished = manifest.diff(previous)  # type: ignore
+                stale_ids.extend(self._get_point_id(doc.id, key) for key in vanished)
+                moved.update(
+                    (self._get_point_id(doc.id, keys[index]), index)
+                    for index in moved_indexes
                 )
-                texts = text_splitter.split_text(doc.knowledge_base_document.content)
-                embeddings = create_embedding(input=texts)
+            else:
+                # The stored points are unknown or keyed differently, replace them all
+                replaced_file_ids.append(doc.id.hex)
+                changed = list(range(len(chunks)))
+
+            logger.debug(
+                f"Document {document.id}: {len(changed)} of {len(chunks)} chunks changed"
+            )
 
+            for index in changed:
+                ids.append(self._get_point_id(doc.id, keys[index]))
+                texts.append(chunks[index])
+                payloads.append(
+                    self._get_payload(doc, document, manifest, chunks, index)
+                )
+
+        # Embed the chunks of every file in one go, so a batch of documents
+        # shares provider round-trips.
+        vectors = embed_texts(texts)
+        sparse_vectors = (
+            self._embed_sparse(texts)
+            if collection_bootstrap.has_sparse_vector(
+                collection_name, SPARSE_VECTOR_NAME, max_age=0
+            )
+            else None
+        )
+
+        with self._writing(collection_name, [doc.id.hex for doc in files]):
+            for file_id in replaced_file_ids:
                 self._remove_file_from_vector_db(
-                    file_id=doc.id.hex,
-                    collection_name=collection_name,
+                    file_id=file_id, collection_name=collection_name
                 )
 
-                for _, (text, embedding) in enumerate(zip(texts, embeddings.data)):
-                    self.vector_db.upload_points(
-                        collection_name=collection_name,
-                        points=[
-                            PointStruct(
-                                id=uuid4().hex,
-                                vector=embedding.embedding,
-                                payload={
-                                    "text": text,
-                                    "file_id": doc.id.hex,
-                                    "knowledge_base_document_id": doc.knowledge_base_document.id.hex,
-                                },
-                            )
-                        ],
-                    )
+            self._upload_points(
+                collection_name=collection_name,
+                ids=ids,
+                vectors=vectors,
+                payloads=payloads,
+                sparse_vectors=sparse_vectors,
+            )
+            self._delete_points(collection_name=collection_name, ids=stale_ids)
+            self._set_chunk_indexes(collection_name=collection_name, indexes=moved)
+
+        for document_id, manifest in manifests.items():
+            self.repository.update(
+                document_id, {"ingest_manifest": manifest.model_dump()}
+            )
 
         return files
 
-    def _get_count_of_points_from_collection(self, file_id: str, collection_name: str):
+    def _defer_to_reindex(self, collection_name: str, file_ids: list[str]) -> bool:
+        """
+        While a rebuild changes the dense vectors, the live collection can't
+        take the vectors embedded now. The files are marked dirty instead and
+        the rebuild embeds them into its target. Checked under the alias lock,
+        so the swap can't happen in between.
+        """
+        state = ReindexState(redis_client, collection_name)
+
+        if not state.is_running():
+            return False
+
+        with collection_bootstrap.lock(collection_name):
+            live = collection_bootstrap.resolve(collection_name)
+
+            if live is None or self._has_same_dense_vectors(
+                live, self._get_collection_spec()
+            ):
+                return False
+
+            state.mark_dirty(file_ids)
+
+        logger.info(
+            f'Collection "{collection_name}" is being re-indexed, '
+            f"deferring {len(file_ids)} files to the rebuild"
+        )
+        return True
+
+    @contextmanager
+    def _writing(self, collection_name: str, file_ids: list[str]):
+        """
+        Guard a write of `file_ids` to a collection. While it is being rebuilt,
+        the files are marked dirty first, so the rebuild re-syncs them even if
+        the write fails, and the write holds the alias lock, so it can't land
+        in the old collection between the rebuild's last catch-up and the
+        swap. The old collection isn't validated then, it may have been built
+        with other vectors.
+        """
+        state = ReindexState(redis_client, collection_name)
+
+        if state.is_running():
+            state.mark_dirty(file_ids)
+
+            with collection_bootstrap.lock(collection_name):
+                yield
+            return
+
+        # First use of a collection takes the same lock, do it beforehand
         self._initialize_vector_collection(collection_name)
+        yield
+        # A rebuild started meanwhile may have read the files before the write
+        state.mark_dirty(file_ids)
+
+    @staticmethod
+    def _chunk_document(
+        content: str, collection_name: str
+    ) -> tuple[list[str], IngestManifest]:
+        chunk_size = get_native_embedding_size()
+        chunk_overlap = 256
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+        )
+
+        chunks = text_splitter.split_text(content)
+        manifest = IngestManifest(
+            content_hash=hash_text(content),
+            embedding_model=get_embedding_model_name(),
+            dimension=get_embedding_size(),
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            chunk_hashes=[hash_text(chunk) for chunk in chunks],
+            collection=collection_name,
+        )
+
+        return chunks, manifest
+
+    @staticmethod
+    def _get_payload(
+        file: File,
+        document: KnowledgeBaseDocument,
+        manifest: IngestManifest,
+        chunks: list[str],
+        index: int,
+    ) -> dict:
+        return {
+            "text": chunks[index],
+            "chunk_index": index,
+            "chunk_hash": manifest.chunk_hashes[index],
+            "file_id": file.id.hex,
+            "knowledge_base_document_id": document.id.hex,
+            "user_id": file.owner_id.hex,
+        }
+
+    def reindex_collection(self, collection_name: str, user: User | None = None):
+        """
+        Rebuild a collection from the documents' stored content into a new
+        versioned collection, then atomically point the alias at it. Queries
+        keep hitting the old collection until the swap.
+
+        Documents are re-embedded in batches of `VECTOR_DB_REINDEX_BATCH_SIZE`
+        with a `VECTOR_DB_REINDEX_INTERVAL_SECONDS` pause in between, so live
+        ingestion keeps its share of the embedding provider. Progress is
+        checkpointed in Redis and a restarted job resumes from it. Files
+        ingested or removed during the rebuild are re-synced before the swap.
+
+        `user` limits the rebuild to one user's documents (per-user layout).
+        """
+        spec = self._get_collection_spec()
+        target = collection_bootstrap.get_versioned_name(collection_name, spec)
+
+        current = collection_bootstrap.resolve(collection_name)
+
+        if current is None:
+            logger.debug(f'No collection "{collection_name}" to re-index')
+            return None
+
+        if current == target:
+            logger.info(f'Collection "{collection_name}" is already up to date')
+            return target
+
+        collection_bootstrap.create(target, spec)
+
+        # When the dense vectors are unchanged (e.g. only the sparse vector
+        # was added), they are copied from the live collection instead of
+        # being embedded again.
+        source = current if self._has_same_dense_vectors(current, spec) else None
+
+        state = ReindexState(redis_client, collection_name)
+        checkpoint = state.start(target)
+        cursor = UUID(checkpoint) if checkpoint else None
+        owner_id = user.id if user else None
+
+        logger.info(
+            f'Re-indexing "{collection_name}" into "{target}" (resuming after: {cursor})'
+        )
+
+        while True:
+            documents = self.repository.get_page_with_content(
+                owner_id=owner_id,
+                after=cursor,
+                limit=settings.VECTOR_DB_REINDEX_BATCH_SIZE,
+                exclude_duplicates=True,
+            )
+            if len(documents) == 0:
+                break
+
+            self._embed_into(target, documents, source)
+
+            cursor = documents[-1].id
+            state.checkpoint(cursor.hex)
+            time.sleep(settings.VECTOR_DB_REINDEX_INTERVAL_SECONDS)
+
+        # Catch up with files that changed while the collection was rebuilt,
+        # then again with writers blocked, so nothing is left behind in the
+        # old collection when the alias moves
+        self._sync_dirty(state, target, source)
+        with collection_bootstrap.lock(collection_name):
+            self._sync_dirty(state, target, source)
+            previous = collection_bootstrap.point_alias(collection_name, target)
+
+        # A writer that outlived the lock timeout may still have written to the
+        # previous collection, it has been marked dirty
+        self._sync_dirty(state, target, source)
+        state.finish()
+
+        if previous is not None:
+            collection_bootstrap.delete_collection(previous)
+
+        # Manifests now describe the new collection
+        cursor = None
+        while documents := self.repository.get_page_with_content(
+            owner_id=owner_id, after=cursor, limit=100, exclude_duplicates=True
+        ):
+            for document in documents:
+                _, manifest = self._chunk_document(
+                    document.content,  # type: ignore
+                    collection_name,
+                )
+                self.repository.update(
+                    document.id, {"ingest_manifest": manifest.model_dump()}
+                )
+            cursor = documents[-1].id
+
+        return target
+
+    def _sync_dirty(self, state: ReindexState, target: str, source: str | None):
+        while file_ids := state.pop_dirty(settings.VECTOR_DB_REINDEX_BATCH_SIZE):
+            for file_id in file_ids:
+                self._remove_file_from_vector_db(file_id, target)
+
+            self._embed_into(
+                target,
+                self.repository.get_by_file_ids([UUID(id) for id in file_ids]),
+                source,
+            )
+
+    def _has_same_dense_vectors(self, collection_name: str, spec: CollectionSpec):
+        metadata = self.vector_db.get_collection(collection_name).config.metadata or {}
+
+        return all(
+            metadata.get(key) == spec.metadata[key]
+            for key in ("embedding_model", "dimension")
+        )
+
+    def _embed_into(
+        self,
+        collection_name: str,
+        documents: list[KnowledgeBaseDocument],
+        source: str | None = None,
+    ):
+        ids: list[str] = []
+        texts: list[str] = []
+        payloads: list[dict] = []
+
+        for document in documents:
+            if not document.content:
+                continue
+
+            chunks, manifest = self._chunk_document(document.content, collection_name)
+            keys = manifest.get_chunk_keys()
+
+            for index in range(len(chunks)):
+                ids.append(self._get_point_id(document.file_id, keys[index]))
+                texts.append(chunks[index])
+                payloads.append(
+                    self._get_payload(document.file, document, manifest, chunks, index)
+                )
+
+        self._upload_points(
+            collection_name=collection_name,
+            ids=ids,
+            vectors=self._get_dense_vectors(ids, texts, payloads, source),
+            payloads=payloads,
+            sparse_vectors=self._embed_sparse(texts),
+        )
+
+    def _get_dense_vectors(
+        self,
+        ids: list[str],
+        texts: list[str],
+        payloads: list[dict],
+        source: str | None,
+    ) -> np.ndarray:
+        """
+        Dense vectors of the chunks, copied from `source` where it holds the
+        same chunk and embedded otherwise.
+        """
+        if source is None or len(ids) == 0:
+            return embed_texts(texts)
+
+        stored = {
+            UUID(str(point.id)).hex: point
+            for point in self.vector_db.retrieve(
+                collection_name=source,
+                ids=ids,
+                with_payload=["chunk_hash"],
+                with_vectors=True,
+            )
+        }
+
+        vectors: list = [None] * len(ids)
+        missing: list[int] = []
+
+        for i, (id, payload) in enumerate(zip(ids, payloads)):
+            point = stored.get(id)
+
+            if (
+                point is None
+                or (point.payload or {}).get("chunk_hash") != payload["chunk_hash"]
+            ):
+                missing.append(i)
+                continue
+
+            vector = point.vector
+            vectors[i] = vector.get("") if isinstance(vector, dict) else vector
+
+        if missing:
+            embedded = embed_texts([texts[i] for i in missing])
+            for i, vector in zip(missing, embedded):
+                vectors[i] = vector
+
+        logger.debug(
+            f'Reused {len(ids) - len(missing)} of {len(ids)} dense vectors from "{source}"'
+        )
+
+        return np.asarray(vectors, dtype=np.float32)
+
+    @staticmethod
+    def _embed_sparse(texts: list[str]) -> list[SparseVector]:
+        return [
+            SparseVector(
+                indices=embedding.indices.tolist(), values=embedding.values.tolist()
+            )
+            for embedding in model_registry.sparse_embedding.embed(texts)
+        ]
+
+    @staticmethod
+    def _get_point_id(file_id: UUID, chunk_key: str) -> str:
+        """
+        Deterministic point id for a chunk, derived from its content (see
+        `IngestManifest.get_chunk_keys`), so re-ingesting a file overwrites its
+        points instead of duplicating them and unchanged chunks keep theirs.
+        """
+        return uuid5(file_id, chunk_key).hex
 
+    def _upload_points(
+        self,
+        collection_name: str,
+        ids: list[str],
+        vectors: np.ndarray,
+        payloads: list[dict],
+        sparse_vectors: list[SparseVector] | None = None,
+    ):
+        if len(ids) == 0:
+            logger.debug(f'No points to upload for collection: "{collection_name}"')
+            return
+
+        if sparse_vectors is not None:
+            vectors = [  # type: ignore
+                {"": dense.tolist(), SPARSE_VECTOR_NAME: sparse}
+                for dense, sparse in zip(vectors, sparse_vectors)
+            ]
+
+        self.vector_db.upload_collection(
+            collection_name=collection_name,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=settings.VECTOR_DB_UPLOAD_BATCH_SIZE,
+            parallel=settings.VECTOR_DB_UPLOAD_PARALLEL,
+            wait=True,
+        )
+
+        logger.debug(f'Uploaded {len(ids)} points to collection: "{collection_name}"')
+
+    def _set_chunk_indexes(self, collection_name: str, indexes: dict[str, int]):
+        """
+        Update the `chunk_index` payload of points whose chunk moved.
+        """
+        if len(indexes) == 0:
+            return
+
+        self.vector_db.batch_update_points(
+            collection_name=collection_name,
+            update_operations=[
+                SetPayloadOperation(
+                    set_payload=SetPayload(payload={"chunk_index": index}, points=[id])
+                )
+                for id, index in indexes.items()
+            ],
+        )
+
+    def _delete_points(self, collection_name: str, ids: list[str]):
+        if len(ids) == 0:
+            return
+
+        result = self.vector_db.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=ids),  # type: ignore
+        )
+
+        logger.debug(
+            f'Removed {len(ids)} stale points from collection: "{collection_name}", with status: "{result.status}"'
+        )
+
+    def _get_count_of_points_from_collection(self, file_id: str, collection_name: str):
+        # Callers write inside `_writing`, which has set the collection up, or
+        # into a rebuild target
         results = self.vector_db.count(
             collection_name=collection_name,
             count_filter=Filter(
@@ -206,12 +764,228 @@ class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
                 collection_name=candidate_controller._get_collection_name(user),
             )
 
-        self._remove_file_from_vector_db(
-            file_id=document.file_id.hex,
-            collection_name=self._get_collection_name(user),
+        collection_name = self._get_collection_name(user)
+
+        with self._writing(collection_name, [document.file_id.hex]):
+            self._remove_file_from_vector_db(
+                file_id=document.file_id.hex,
+                collection_name=collection_name,
+            )
+            self.repository.delete(document)
+
+    def fingerprint_document(self, document: KnowledgeBaseDocument) -> list[int] | None:
+        """
+        Store the MinHash signature and LSH buckets of the document's content.
+        """
+        signature = get_signature(document.content or "")
+        self._store_fingerprint(document.id, signature)
+
+        return signature
+
+    def _store_fingerprint(self, document_id: UUID, signature: list[int] | None):
+        if signature is None:
+            return
+
+        self.repository.update_columns(
+            [document_id], {"minhash": signature, "lsh_bands": get_bands(signature)}
         )
 
-        self.repository.delete(document)
+    def link_near_duplicate(
+        self, document_id: UUID, owner_id: UUID, signature: list[int] | None
+    ) -> NearDuplicate | None:
+        """
+        Store the fingerprint of a freshly extracted document, built while its
+        pages were extracted (see `MinHasher`), and look for a near-duplicate
+        among the owner's documents that have a candidate or are still being
+        ingested. Other owners' documents never match: a duplicate is not
+        embedded into its owner's collection, so it has to be covered by one
+        already there. The most similar match at or above `DEDUP_THRESHOLD` is
+        recorded as `duplicate_of_id` and returned.
+
+        Matching runs under a lock, so of two copies extracted at the same
+        time exactly one stays the original.
+        """
+        self._store_fingerprint(document_id, signature)
+
+        if signature is None or not settings.DEDUP_ENABLED:
+            return None
+
+        with self._dedup_lock():
+            original = self._find_original(document_id, owner_id, signature)
+
+            if original is None:
+                self.repository.update_columns([document_id], {"duplicate_of_id": None})
+                return None
+
+            # A duplicate's own chain ends here
+            self.repository.update_columns(
+                [document_id],
+                {"duplicate_of_id": original.id, "ingestion_status": "SUCCESS"},
+            )
+
+        return original
+
+    def fail_ingestion(self, document_ids: list[UUID]):
+        """
+        Record that the ingestion of documents failed. Copies linked to them
+        while they were in progress are matched again, or ingested on their
+        own when nothing else matches.
+        """
+        requeued: list[tuple[UUID, UUID, UUID]] = []
+
+        with self._dedup_lock():
+            self.repository.update_columns(
+                document_ids, {"ingestion_status": "FAILURE"}
+            )
+
+            for document_id in document_ids:
+                duplicates = [
+                    (
+                        duplicate.id,
+                        duplicate.file_id,
+                        duplicate.file.owner_id,
+                        duplicate.minhash,
+                    )
+                    for duplicate in self.repository.get_duplicates_of(document_id)
+                ]
+
+                for id, file_id, owner_id, signature in duplicates:
+                    original = (
+                        self._find_original(id, owner_id, signature)
+                        if signature is not None and settings.DEDUP_ENABLED
+                        else None
+                    )
+
+                    if original is None:
+                        self.repository.update_columns(
+                            [id],
+                            {"duplicate_of_id": None, "ingestion_status": "PROGRESS"},
+                        )
+                        requeued.append((id, file_id, owner_id))
+                        continue
+
+                    if original.id == document_id:
+                        # It has its candidate, only a later step failed
+                        continue
+
+                    self.repository.update_columns(
+                        [id], {"duplicate_of_id": original.id}
+                    )
+                    ingestion_progress.publish(
+                        owner_id,
+                        "duplicate",
+                        file_id=file_id,
+                        knowledge_base_document_id=id,
+                        duplicate_of_id=original.id,
+                        candidate_id=original.candidate_id,
+                    )
+
+        for id, file_id, owner_id in requeued:
+            logger.info(f"Original of document {id} failed, ingesting it on its own")
+
+            workflow = chain(
+                store_embeddings.si(id.hex, owner_id),  # type: ignore
+                create_candidate.s(),  # type: ignore
+                create_candidate_embeddings.s(owner_id),  # type: ignore
+            )
+            workflow.link_error(publish_ingestion_failure.si(file_id, owner_id))  # type: ignore
+            workflow.apply_async()
+
+    def _find_original(
+        self, document_id: UUID, owner_id: UUID, signature: list[int]
+    ) -> NearDuplicate | None:
+        """
+        The owner's document most similar to `signature` at or above
+        `DEDUP_THRESHOLD`, among those with a candidate or still being ingested.
+        Has to run under the near-duplicate lock. Read before anything is
+        committed: touching the expired document afterwards would load its
+        content.
+        """
+        matches = [
+            (get_similarity(signature, match.minhash), match)
+            for match in self.repository.find_near_duplicates(
+                owner_id=owner_id,
+                bands=get_bands(signature),
+                exclude_id=document_id,
+            )
+            if match.minhash is not None
+        ]
+        matches = [match for match in matches if match[0] >= settings.DEDUP_THRESHOLD]
+
+        if len(matches) == 0:
+            return None
+
+        similarity, original = max(matches, key=lambda match: match[0])
+        logger.info(
+            f"Document {document_id} is a near-duplicate of {original.id} (similarity: {similarity:.2f})"
+        )
+
+        return NearDuplicate(
+            id=original.id,
+            candidate_id=original.candidate.id if original.candidate else None,
+            similarity=similarity,
+        )
+
+    @contextmanager
+    def _dedup_lock(self):
+        lock = redis_client.lock(DEDUP_LOCK, timeout=30, blocking_timeout=30)
+
+        try:
+            acquired = lock.acquire()
+        except RedisError as e:
+            logger.warning(f"Matching near-duplicates without a lock: {e}")
+            acquired = False
+
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except RedisError as e:
+                    logger.warning(f"Unable to release the near-duplicate lock: {e}")
+
+    def get_duplicate_clusters(self, user: User) -> list[DuplicateCluster]:
+        """
+        Clusters of the user's near-duplicate documents, each ordered by
+        upload time.
+        """
+        documents = {
+            document.id: document
+            for document in self.repository.get_fingerprinted(owner_id=user.id)
+        }
+        clusters = get_clusters(
+            ((id, document.minhash) for id, document in documents.items()),  # type: ignore
+            threshold=settings.DEDUP_THRESHOLD,
+        )
+
+        report = []
+        for cluster in clusters:
+            members = sorted(
+                (documents[id] for id in cluster),
+                key=lambda document: document.created_at,
+            )
+            first = members[0]
+
+            report.append(
+                DuplicateCluster(
+                    documents=[
+                        DuplicateDocument(
+                            id=document.id,
+                            file_id=document.file_id,
+                            filename=document.file.original_filename,
+                            candidate_id=(
+                                document.candidate.id if document.candidate else None
+                            ),
+                            duplicate_of_id=document.duplicate_of_id,
+                            similarity=get_similarity(first.minhash, document.minhash),  # type: ignore
+                        )
+                        for document in members
+                    ]
+                )
+            )
+
+        return report
 
     def get_document_by_file_id(self, user: User, file_id: UUID):
         doc = self.repository.session.exec(
@@ -244,3 +1018,16 @@ class KnowledgeBaseController(BaseController[KnowledgeBaseDocument]):
             raise NotFoundException(f"No document exists with id: {id}")
 
         return doc
+
+
+def resolve_collection_spec(name: str) -> CollectionSpec | None:
+    """
+    Expected config of a collection managed by the app, from its name.
+    """
+    if CandidateController._is_collection_name(name):
+        return CandidateController._get_collection_spec()
+
+    if KnowledgeBaseController._is_collection_name(name):
+        return KnowledgeBaseController._get_collection_spec()
+
+    return None
@@ -0,0 +1,71 @@
+from typing import Any, AsyncIterator
+from uuid import UUID
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+from redis.exceptions import RedisError
+
+from src.core.logger import logger
+from src.core.redis import async_redis_client, redis_client
+
+from .schema import IngestionEvent, IngestionEventType
+
+
+class IngestionProgress:
+    """
+    Publishes ingestion progress on a per-user Redis channel and streams it
+    back as server-sent events. Progress is best effort: a Redis outage never
+    fails an ingestion step.
+    """
+
+    CHANNEL_PREFIX = "ingestion"
+    KEEP_ALIVE_SECONDS = 15.0
+
+    def __init__(self, redis: Redis, async_redis: AsyncRedis) -> None:
+        self.redis = redis
+        self.async_redis = async_redis
+
+    @classmethod
+    def channel(cls, user_id: UUID | str) -> str:
+        return f"{cls.CHANNEL_PREFIX}:{UUID(str(user_id)).hex}"
+
+    def publish(
+        self,
+        user_id: UUID | str | None,
+        event: IngestionEventType,
+        **data: Any,
+    ) -> None:
+        if user_id is None:
+            return
+
+        message = IngestionEvent(event=event, **data)
+
+        try:
+            self.redis.publish(
+                self.channel(user_id), message.model_dump_json(exclude_none=True)
+            )
+        except RedisError as e:
+            logger.warning(f"Unable to publish ingestion event '{event}': {e}")
+
+    async def stream(self, user_id: UUID) -> AsyncIterator[str]:
+        pubsub = self.async_redis.pubsub()
+        await pubsub.subscribe(self.channel(user_id))
+
+        try:
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.KEEP_ALIVE_SECONDS
+                )
+
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                event = IngestionEvent.model_validate_json(message["data"])
+                yield f"event: {event.event}\ndata: {message['data'].decode()}\n\n"
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+
+ingestion_progress = IngestionProgress(redis_client, async_redis_client)
@@ -1,8 +1,13 @@
+from typing import Any
 from uuid import UUID
 
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import defer, selectinload
+from sqlmodel import col, func, select
+
 from src.core.exception import NotFoundException
 from src.core.repository.base import BaseRepository
-from src.models.models import KnowledgeBaseDocument
+from src.models.models import Candidate, File, KnowledgeBaseDocument
 
 
 class KnowledgeBaseDocumentRepository(BaseRepository[KnowledgeBaseDocument]):
@@ -20,3 +25,147 @@ class KnowledgeBaseDocumentRepository(BaseRepository[KnowledgeBaseDocument]):
             return self.get_by("task_id", task_id, unique=True)
         except Exception:
             return None
+
+    def append_content(self, id: UUID, content: str) -> None:
+        """
+        Append text to a document's content in the database, without loading
+        the existing content into memory.
+        """
+        statement = (
+            update(self.model_class)
+            .where(self.model_class.id == id)  # type: ignore
+            .values(
+                content=func.concat(
+                    func.coalesce(self.model_class.content, ""), content
+                )
+            )
+        )
+        self.session.exec(statement)  # type: ignore
+        self.session.commit()
+
+    def update_columns(self, ids: list[UUID], attributes: dict[str, Any]) -> None:
+        """
+        Set columns of documents with a single statement, without loading the
+        documents (and their content).
+        """
+        if len(ids) == 0:
+            return
+
+        statement = (
+            update(self.model_class)
+            .where(col(self.model_class.id).in_(ids))
+            .values(**attributes)
+        )
+        self.session.exec(statement)  # type: ignore
+        self.session.commit()
+
+    def get_id_by_file_id(self, file_id: UUID) -> UUID | None:
+        statement = select(self.model_class.id).where(
+            self.model_class.file_id == file_id  # type: ignore
+        )
+
+        return self.session.exec(statement).one_or_none()
+
+    def get_page_with_content(
+        self,
+        *,
+        owner_id: UUID | None,
+        after: UUID | None,
+        limit: int,
+        exclude_duplicates: bool = False,
+    ) -> list[KnowledgeBaseDocument]:
+        """
+        Extracted documents ordered by id, paged by the last id seen.
+        """
+        statement = (
+            self._query()
+            .join(self.model_class.file)  # type: ignore
+            .where(col(self.model_class.content).is_not(None))
+            .options(selectinload(self.model_class.file))  # type: ignore
+            .order_by(col(self.model_class.id))
+            .limit(limit)
+        )
+
+        if owner_id is not None:
+            statement = statement.where(File.owner_id == owner_id)
+
+        if exclude_duplicates:
+            statement = statement.where(col(self.model_class.duplicate_of_id).is_(None))
+
+        if after is not None:
+            statement = statement.where(col(self.model_class.id) > after)
+
+        return list(self.session.exec(statement).all())
+
+    def get_by_file_ids(self, file_ids: list[UUID]) -> list[KnowledgeBaseDocument]:
+        statement = (
+            self._query()
+            .where(col(self.model_class.file_id).in_(file_ids))
+            .where(col(self.model_class.content).is_not(None))
+            .options(selectinload(self.model_class.file))  # type: ignore
+        )
+
+        return list(self.session.exec(statement).all())
+
+    def find_near_duplicates(
+        self,
+        *,
+        owner_id: UUID,
+        bands: list[int],
+        exclude_id: UUID,
+    ) -> list[KnowledgeBaseDocument]:
+        """
+        Documents of the owner that share at least one LSH bucket with `bands`
+        and either have a candidate, or are originals still being ingested.
+        """
+        statement = (
+            self._query()
+            .join(self.model_class.file)  # type: ignore
+            .outerjoin(self.model_class.candidate)  # type: ignore
+            .where(File.owner_id == owner_id)
+            .where(col(self.model_class.id) != exclude_id)
+            .where(col(self.model_class.lsh_bands).overlap(bands))
+            .where(
+                or_(
+                    col(Candidate.id).is_not(None),
+                    and_(
+                        col(self.model_class.duplicate_of_id).is_(None),
+                        col(self.model_class.ingestion_status) == "PROGRESS",
+                    ),
+                )
+            )
+            .options(
+                defer(self.model_class.content),  # type: ignore
+                selectinload(self.model_class.candidate),  # type: ignore
+            )
+        )
+
+        return list(self.session.exec(statement).all())
+
+    def get_duplicates_of(self, id: UUID) -> list[KnowledgeBaseDocument]:
+        statement = (
+            self._query()
+            .where(col(self.model_class.duplicate_of_id) == id)
+            .options(
+                defer(self.model_class.content),  # type: ignore
+                selectinload(self.model_class.file),  # type: ignore
+            )
+        )
+
+        return list(self.session.exec(statement).all())
+
+    def get_fingerprinted(self, owner_id: UUID) -> list[KnowledgeBaseDocument]:
+        statement = (
+            self._query()
+            .join(self.model_class.file)  # type: ignore
+            .where(File.owner_id == owner_id)
+            .where(col(self.model_class.minhash).is_not(None))
+            .options(
+                defer(self.model_class.content),  # type: ignore
+                selectinload(self.model_class.file),  # type: ignore
+                selectinload(self.model_class.candidate),  # type: ignore
+            )
+            .order_by(col(self.model_class.created_at))
+        )
+
+        return list(self.session.exec(statement).all())
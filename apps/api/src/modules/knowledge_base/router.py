@@ -1,16 +1,28 @@
 from uuid import UUID
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
-from src.core.dependencies import CurrentUser
+from src.core.dependencies import CurrentUser, StreamUser
+from src.core.exception import NotFoundException
 from src.core.factory.factory import (
     CandidateControllerDeps,
     FileControllerDeps,
+    IngestionBatchControllerDeps,
     KnowledgeBaseControllerDeps,
 )
 from src.models.models import KnowledgeBaseDocument, KnowledgeBaseDocumentWithFile
+from src.modules.ingestion_batch.schema import (
+    BatchExtractionRequest,
+    IngestionBatchPublic,
+)
 
-from .schema import DocumentExtractionRequest, IngestDocumentRequest
+from .progress import ingestion_progress
+from .schema import (
+    DocumentExtractionRequest,
+    DuplicateCluster,
+    IngestDocumentRequest,
+)
 
 router = APIRouter(prefix="/knowledge-base", tags=["Knowledge Base"])
 
@@ -29,6 +41,64 @@ def enqueue_document(
     return knowledge_base_document
 
 
+@router.post("/batch", response_model=IngestionBatchPublic)
+def enqueue_documents(
+    body: BatchExtractionRequest,
+    knowledge_base_controller: KnowledgeBaseControllerDeps,
+    ingestion_batch_controller: IngestionBatchControllerDeps,
+    file_controller: FileControllerDeps,
+    user: CurrentUser,
+):
+    file_ids = set(body.file_ids)
+    documents = file_controller.get_files_by_ids(ids=list(file_ids), user_id=user.id)
+
+    if len(documents) != len(file_ids):
+        missing = file_ids - {document.id for document in documents}
+        raise NotFoundException(
+            f"No files found with ids: {', '.join(map(str, missing))}"
+        )
+
+    return knowledge_base_controller.enqueue_documents(
+        user=user,
+        documents=documents,
+        ingestion_batch_controller=ingestion_batch_controller,
+    )
+
+
+@router.get("/batch/{batch_id}", response_model=IngestionBatchPublic)
+def batch_status(
+    batch_id: UUID,
+    user: CurrentUser,
+    ingestion_batch_controller: IngestionBatchControllerDeps,
+):
+    return ingestion_batch_controller.get_batch(batch_id, user)
+
+
+@router.get("/events")
+async def ingestion_events(user: StreamUser):
+    """
+    Server-sent events for every ingestion step of the user's documents, so
+    clients don't have to poll the status endpoints. No database connection
+    is held while the stream is open.
+    """
+    return StreamingResponse(
+        ingestion_progress.stream(user.id),
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Connection": "keep-alive",
+            "Content-Type": "text/event-stream",
+        },
+    )
+
+
+@router.get("/duplicates", response_model=list[DuplicateCluster])
+def get_duplicates(
+    user: CurrentUser, knowledge_base_controller: KnowledgeBaseControllerDeps
+):
+    return knowledge_base_controller.get_duplicate_clusters(user)
+
+
 @router.get("/status/{id}", response_model=KnowledgeBaseDocument)
 def task_status(id: str, knowledge_base_controller: KnowledgeBaseControllerDeps):
     return knowledge_base_controller.get_task_status(id)
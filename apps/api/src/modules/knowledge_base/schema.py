@@ -1,6 +1,9 @@
-from typing import Optional
+import hashlib
+from datetime import datetime, timezone
+from typing import Literal, Optional
 from uuid import UUID
 
+from pydantic import BaseModel
 from sqlmodel import Field, SQLModel
 
 
@@ -8,6 +11,11 @@ class DocumentExtractionRequest(SQLModel):
     file_id: UUID
 
 
+# Progress of a document's own ingestion chain. Near-duplicates only link to
+# originals that are in progress or have a candidate.
+type IngestionStatus = Literal["PROGRESS", "SUCCESS", "FAILURE"]
+
+
 class KnowledgeBaseDocumentBase(SQLModel):
     file_id: UUID
     status: Optional[str] = Field(default=None)
@@ -17,3 +25,136 @@ class KnowledgeBaseDocumentBase(SQLModel):
 
 class IngestDocumentRequest(SQLModel):
     documents: list[UUID]
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IngestManifest(BaseModel):
+    """
+    What was last ingested into the vector store for a document, and where.
+    """
+
+    content_hash: str
+    embedding_model: str
+    dimension: int
+    chunk_size: int
+    chunk_overlap: int
+    chunk_hashes: list[str]
+    # Collection (alias) the points were written to, so switching between
+    # per-user and shared collections re-ingests everything. Manifests from
+    # before it was recorded had index based point ids and never match.
+    collection: Optional[str] = None
+
+    def _config(self) -> tuple[str, int, int, int, str | None]:
+        return (
+            self.embedding_model,
+            self.dimension,
+            self.chunk_size,
+            self.chunk_overlap,
+            self.collection,
+        )
+
+    def is_compatible(self, previous: Optional["IngestManifest"]) -> bool:
+        """
+        Whether the points of `previous` can be updated chunk by chunk.
+        """
+        return previous is not None and previous._config() == self._config()
+
+    def is_unchanged(self, previous: Optional["IngestManifest"]) -> bool:
+        return (
+            self.is_compatible(previous) and previous.content_hash == self.content_hash  # type: ignore
+        )
+
+    def get_chunk_keys(self) -> list[str]:
+        """
+        Stable keys of the chunks: their hash, numbered when the same text
+        occurs more than once. Point ids derive from these keys.
+        """
+        occurrences: dict[str, int] = {}
+        keys = []
+
+        for chunk_hash in self.chunk_hashes:
+            count = occurrences.get(chunk_hash, 0)
+            occurrences[chunk_hash] = count + 1
+            keys.append(chunk_hash if count == 0 else f"{chunk_hash}:{count}")
+
+        return keys
+
+    def diff(
+        self, previous: "IngestManifest"
+    ) -> tuple[list[int], list[int], list[str]]:
+        """
+        Indexes of new chunks to embed and upsert, indexes of kept chunks that
+        moved, and keys of chunks that vanished. Points are keyed by chunk
+        hash, so inserting text only touches the chunks around it.
+        """
+        previous_indexes = {
+            key: index for index, key in enumerate(previous.get_chunk_keys())
+        }
+        keys = self.get_chunk_keys()
+
+        added = [index for index, key in enumerate(keys) if key not in previous_indexes]
+        moved = [
+            index
+            for index, key in enumerate(keys)
+            if key in previous_indexes and previous_indexes[key] != index
+        ]
+        vanished = list(previous_indexes.keys() - set(keys))
+
+        return added, moved, vanished
+
+
+type IngestionEventType = Literal[
+    "parsing",
+    "parsed",
+    "duplicate",
+    "embedded",
+    "candidate_created",
+    "completed",
+    "failed",
+]
+
+
+class IngestionEvent(BaseModel):
+    """
+    Progress of a document through the ingestion chain, pushed to the owner
+    over server-sent events.
+    """
+
+    event: IngestionEventType
+    file_id: Optional[UUID] = None
+    knowledge_base_document_id: Optional[UUID] = None
+    candidate_id: Optional[UUID] = None
+    duplicate_of_id: Optional[UUID] = None
+    batch_id: Optional[UUID] = None
+    pages: Optional[int] = None
+    chunks: Optional[int] = None
+    error: Optional[str] = None
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class NearDuplicate(BaseModel):
+    """
+    The original a freshly extracted document was found to duplicate.
+    """
+
+    id: UUID
+    candidate_id: Optional[UUID] = None
+    similarity: float
+
+
+class DuplicateDocument(SQLModel):
+    id: UUID
+    file_id: UUID
+    filename: str
+    candidate_id: Optional[UUID] = None
+    duplicate_of_id: Optional[UUID] = None
+    similarity: float = Field(
+        description="Estimated similarity to the first document of the cluster"
+    )
+
+
+class DuplicateCluster(SQLModel):
+    documents: list[DuplicateDocument]
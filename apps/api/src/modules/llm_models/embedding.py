@@ -1,50 +1,103 @@
-from openai import AzureOpenAI, OpenAI
-from openai.types import CreateEmbeddingResponse
+import asyncio
+
+import numpy as np
 
 from src.core.config import settings
 
+from .embedding_cache import embedding_cache
+from .embedding_client import get_embedding_client
 from .types import EmbeddingProvider
 
-llama_cpp = OpenAI(
-    base_url=f"{settings.EMBEDDING_MODEL_HOST}/v1",
-    api_key=str(settings.EMBEDDING_MODEL_SECRET),
-)
 
-openai = OpenAI(api_key=settings.OPEN_API_KEY.get_secret_value())
+def _lookup_cached(
+    texts: list[str], provider: EmbeddingProvider
+) -> tuple[list[str], list[np.ndarray | None], list[int]]:
+    model = get_embedding_model_name(provider)
+    dimension = get_embedding_size(provider)
+
+    keys = [
+        embedding_cache.make_key(provider, model, dimension, text) for text in texts
+    ]
+    vectors = embedding_cache.get_many(keys)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+    return keys, vectors, missing
+
+
+def _store_embedded(
+    keys: list[str],
+    vectors: list[np.ndarray | None],
+    missing: list[int],
+    embeddings: np.ndarray,
+) -> np.ndarray:
+    for i, embedding in zip(missing, embeddings):
+        vectors[i] = embedding
 
-azure_openai = AzureOpenAI(
-    api_key=settings.AZURE_OPEN_AI_KEY.get_secret_value(),
-    azure_endpoint=settings.AZURE_OPEN_AI_ENDPOINT,
-    api_version=settings.AZURE_OPEN_AI_VERSION,
-)
+    embedding_cache.set_many({keys[i]: vectors[i] for i in missing})  # type: ignore
 
+    return np.vstack(vectors)  # type: ignore
 
-def create_embedding(
-    input: str | list[str],
+
+def embed_texts(
+    texts: list[str],
     provider: EmbeddingProvider = settings.DEFAULT_EMBEDDING_MODEL,
-) -> CreateEmbeddingResponse:
+) -> np.ndarray:
+    """
+    Embed texts as a `(n, dim)` float32 matrix, only calling the provider for
+    texts that are not in the embedding cache.
+    """
+    if len(texts) == 0:
+        return np.empty((0, get_embedding_size(provider)), dtype=np.float32)
+
+    keys, vectors, missing = _lookup_cached(texts, provider)
+
+    if len(missing) == 0:
+        return np.vstack(vectors)  # type: ignore
+
+    client = get_embedding_client(
+        provider, get_embedding_model_name(provider), get_embedding_dimensions(provider)
+    )
+    embeddings = client.embed([texts[i] for i in missing])
+
+    return _store_embedded(keys, vectors, missing, embeddings)
+
+
+async def aembed_texts(
+    texts: list[str],
+    provider: EmbeddingProvider = settings.DEFAULT_EMBEDDING_MODEL,
+) -> np.ndarray:
+    """
+    Async variant of `embed_texts`.
+    """
+    if len(texts) == 0:
+        return np.empty((0, get_embedding_size(provider)), dtype=np.float32)
+
+    keys, vectors, missing = await asyncio.to_thread(_lookup_cached, texts, provider)
+
+    if len(missing) == 0:
+        return np.vstack(vectors)  # type: ignore
+
+    client = get_embedding_client(
+        provider, get_embedding_model_name(provider), get_embedding_dimensions(provider)
+    )
+    embeddings = await client.aembed([texts[i] for i in missing])
+
+    return await asyncio.to_thread(_store_embedded, keys, vectors, missing, embeddings)
+
+
+def get_embedding_model_name(
+    provider: EmbeddingProvider = settings.DEFAULT_EMBEDDING_MODEL,
+) -> str:
     match provider:
         case "azure-openai":
-            return azure_openai.embeddings.create(
-                input=input,
-                model="text-embedding-3-large",
-                encoding_format="float",
-            )
+            return "text-embedding-3-large"
         case "openai":
-            return openai.embeddings.create(
-                input=input,
-                model="text-embedding-3-large",
-                encoding_format="float",
-            )
+            return "text-embedding-3-large"
         case _:
-            return llama_cpp.embeddings.create(
-                input=input,
-                model=settings.EMBEDDING_MODEL_NAME,
-                encoding_format="float",
-            )
+            return settings.EMBEDDING_MODEL_NAME
 
 
-def get_embedding_size(
+def get_native_embedding_size(
     provider: EmbeddingProvider = settings.DEFAULT_EMBEDDING_MODEL,
 ) -> int:
     match provider:
@@ -54,3 +107,26 @@ def get_embedding_size(
             return 3072
         case _:
             return 1024
+
+
+def get_embedding_dimensions(
+    provider: EmbeddingProvider = settings.DEFAULT_EMBEDDING_MODEL,
+) -> int | None:
+    """
+    Output dimension requested from the provider. Only `text-embedding-3-*`
+    models can shorten their (Matryoshka) embeddings, other providers always
+    return their native size.
+    """
+    match provider:
+        case "azure-openai":
+            return settings.EMBEDDING_DIMENSIONS
+        case "openai":
+            return settings.EMBEDDING_DIMENSIONS
+        case _:
+            return None
+
+
+def get_embedding_size(
+    provider: EmbeddingProvider = settings.DEFAULT_EMBEDDING_MODEL,
+) -> int:
+    return get_embedding_dimensions(provider) or get_native_embedding_size(provider)
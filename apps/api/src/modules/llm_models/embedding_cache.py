@@ -0,0 +1,287 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+from redis import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis import redis_client
+
+from .types import EmbeddingProvider
+
+
+class EmbeddingStore(Protocol):
+    def get_many(self, keys: list[str]) -> list[bytes | None]: ...
+
+    def set_many(self, items: dict[str, bytes]) -> None: ...
+
+
+class RedisEmbeddingStore:
+    """
+    Embeddings stored as raw float32 bytes. A sorted set of keys scored by
+    last access time keeps the cache bounded to `max_entries` (LRU).
+    """
+
+    INDEX_KEY = "embedding:index"
+
+    def __init__(self, client: Redis, max_entries: int, ttl: int | None) -> None:
+        self.client = client
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        values: list[bytes | None] = self.client.mget(keys)  # type: ignore
+
+        hits = {key: time.time() for key, value in zip(keys, values) if value}
+        if hits:
+            self.client.zadd(self.INDEX_KEY, hits)  # type: ignore
+
+        return values
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        now = time.time()
+
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(key, value, ex=self.ttl)
+        pipeline.zadd(self.INDEX_KEY, {key: now for key in items})
+        pipeline.execute()
+
+        self._evict()
+
+    def _evict(self) -> None:
+        excess = self.client.zcard(self.INDEX_KEY) - self.max_entries  # type: ignore
+        if excess <= 0:
+            return
+
+        evicted = self.client.zpopmin(self.INDEX_KEY, excess)  # type: ignore
+        if evicted:
+            self.client.delete(*[key for key, _ in evicted])
+
+        logger.debug(f"Evicted {len(evicted)} embeddings from redis cache")
+
+
+class DiskEmbeddingStore:
+    """
+    SQLite backed store used when Redis is unavailable.
+    """
+
+    def __init__(self, path: Path, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection: sqlite3.Connection | None = None
+        self._pid: int | None = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Connections must not be shared across forked worker processes.
+        if self._connection is None or self._pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS embedding "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS embedding_accessed_at "
+                "ON embedding (accessed_at)"
+            )
+            connection.commit()
+
+            self._connection = connection
+            self._pid = os.getpid()
+
+        return self._connection
+
+    def get_many(self, keys: list[str]) -> list[bytes | None]:
+        placeholders = ",".join("?" * len(keys))
+
+        with self._lock:
+            rows = self.connection.execute(
+                f"SELECT key, value FROM embedding WHERE key IN ({placeholders})",
+                keys,
+            ).fetchall()
+            self.connection.executemany(
+                "UPDATE embedding SET accessed_at = ? WHERE key = ?",
+                [(time.time(), key) for key, _ in rows],
+            )
+            self.connection.commit()
+
+        values = dict(rows)
+        return [values.get(key) for key in keys]
+
+    def set_many(self, items: dict[str, bytes]) -> None:
+        now = time.time()
+
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO embedding (key, value, accessed_at) "
+                "VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items.items()],
+            )
+            self.connection.execute(
+                "DELETE FROM embedding WHERE key IN ("
+                "SELECT key FROM embedding ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            self.connection.commit()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed embedding cache keyed by
+    (provider, model, dimension, sha256(text)).
+
+    Redis is the primary store. If Redis cannot be reached the cache switches
+    to the on-disk store and tries Redis again after `retry_after` seconds.
+    """
+
+    def __init__(
+        self,
+        primary: EmbeddingStore | None,
+        fallback: EmbeddingStore | None = None,
+        retry_after: float = 30,
+    ) -> None:
+        self.primary = primary or fallback
+        self.fallback = fallback
+        self.retry_after = retry_after
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._failed_at: float | None = None
+
+    @staticmethod
+    def make_key(
+        provider: EmbeddingProvider, model: str, dimension: int, text: str
+    ) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"embedding:{provider}:{model}:{dimension}:{digest}"
+
+    @property
+    def store(self) -> EmbeddingStore | None:
+        failed_at = self._failed_at
+        if failed_at is not None and time.monotonic() - failed_at < self.retry_after:
+            return self.fallback
+
+        return self.primary
+
+    def _use_fallback(self, store: EmbeddingStore, error: Exception) -> bool:
+        if self.fallback is None or store is self.fallback:
+            logger.warning(f"Embedding cache unavailable: {error}")
+            return False
+
+        logger.warning(
+            f"Embedding cache falling back to disk for {self.retry_after}s: {error}"
+        )
+        self._failed_at = time.monotonic()
+        return True
+
+    def _recover(self, store: EmbeddingStore) -> None:
+        if self._failed_at is not None and store is not self.fallback:
+            logger.info("Embedding cache is back on its primary store")
+            self._failed_at = None
+
+    def _read(self, store: EmbeddingStore, keys: list[str]) -> list[bytes | None]:
+        try:
+            values = store.get_many(keys)
+        except (RedisError, sqlite3.Error) as e:
+            if self._use_fallback(store, e):
+                return self._read(self.fallback, keys)  # type: ignore
+            return [None] * len(keys)
+
+        self._recover(store)
+        return values
+
+    def _write(self, store: EmbeddingStore, values: dict[str, bytes]) -> None:
+        try:
+            store.set_many(values)
+        except (RedisError, sqlite3.Error) as e:
+            if self._use_fallback(store, e):
+                self._write(self.fallback, values)  # type: ignore
+            return
+
+        self._recover(store)
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get_many(self, keys: list[str]) -> list[np.ndarray | None]:
+        store = self.store
+        if store is None or len(keys) == 0:
+            self._count(0, len(keys))
+            return [None] * len(keys)
+
+        vectors = [
+            np.frombuffer(value, dtype=np.float32) if value else None
+            for value in self._read(store, keys)
+        ]
+
+        hits = sum(1 for vector in vectors if vector is not None)
+        self._count(hits, len(keys) - hits)
+
+        logger.debug(f"Embedding cache: {hits}/{len(keys)} hits")
+
+        return vectors
+
+    def set_many(self, items: dict[str, np.ndarray]) -> None:
+        store = self.store
+        if store is None or len(items) == 0:
+            return
+
+        values = {
+            key: np.asarray(vector, dtype=np.float32).tobytes()
+            for key, vector in items.items()
+        }
+        self._write(store, values)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+        }
+
+
+def _create_embedding_cache() -> EmbeddingCache:
+    match settings.EMBEDDING_CACHE_BACKEND:
+        case "redis":
+            return EmbeddingCache(
+                primary=RedisEmbeddingStore(
+                    client=redis_client,
+                    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                    ttl=settings.EMBEDDING_CACHE_TTL_SECONDS,
+                ),
+                fallback=DiskEmbeddingStore(
+                    path=Path(settings.EMBEDDING_CACHE_PATH),
+                    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                ),
+                retry_after=settings.EMBEDDING_CACHE_RETRY_SECONDS,
+            )
+        case "disk":
+            return EmbeddingCache(
+                primary=DiskEmbeddingStore(
+                    path=Path(settings.EMBEDDING_CACHE_PATH),
+                    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+                )
+            )
+        case _:
+            return EmbeddingCache(primary=None)
+
+
+embedding_cache = _create_embedding_cache()
@@ -0,0 +1,244 @@
+import asyncio
+import base64
+import os
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+import httpx
+import numpy as np
+import tiktoken
+from openai import (
+    NOT_GIVEN,
+    APIConnectionError,
+    APIError,
+    APIStatusError,
+    AsyncAzureOpenAI,
+    AsyncOpenAI,
+)
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.utils.event_loop import background_loop
+
+from .types import EmbeddingProvider
+
+
+@dataclass(frozen=True)
+class EmbeddingLimits:
+    max_items: int
+    max_tokens: int
+
+
+EMBEDDING_LIMITS: dict[EmbeddingProvider, EmbeddingLimits] = {
+    "azure-openai": EmbeddingLimits(max_items=2048, max_tokens=300_000),
+    "openai": EmbeddingLimits(max_items=2048, max_tokens=300_000),
+    # llama-server embeds a whole request in one ubatch (`-ub 8192`)
+    "llama-cpp": EmbeddingLimits(max_items=64, max_tokens=8192),
+}
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding | None:
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Unable to load tiktoken encoding, estimating tokens: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 3 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+# The status codes the OpenAI SDK retries on, besides any 5xx
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+MAX_RETRY_DELAY = 60.0
+
+
+def is_retryable(error: APIError) -> bool:
+    if isinstance(error, APIConnectionError):
+        # Timeouts included
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def get_retry_delay(error: APIError, attempt: int) -> float:
+    """
+    Seconds to wait before retrying: the provider's `retry-after-ms` or
+    `Retry-After` when it sent one, exponential backoff with jitter otherwise.
+    """
+    if isinstance(error, APIStatusError):
+        headers = error.response.headers
+
+        try:
+            if "retry-after-ms" in headers:
+                return min(float(headers["retry-after-ms"]) / 1000, MAX_RETRY_DELAY)
+
+            retry_after = headers.get("retry-after")
+            if retry_after is not None:
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                return min(max(delay, 0.0), MAX_RETRY_DELAY)
+        except (TypeError, ValueError):
+            pass
+
+    return min(2**attempt, 30) + random.random()
+
+
+class EmbeddingClient:
+    """
+    Async embedding client for one provider.
+
+    Inputs are split into sub-batches that respect the provider's item and
+    token limits. Sub-batches run concurrently (bounded by
+    `EMBEDDING_MAX_CONCURRENCY`) over one keep-alive connection pool. Vectors
+    are requested as base64 and decoded straight into float32 arrays.
+
+    `dimensions` asks the provider for shortened embeddings, when supported.
+    """
+
+    def __init__(
+        self, provider: EmbeddingProvider, model: str, dimensions: int | None = None
+    ) -> None:
+        self.provider = provider
+        self.model = model
+        self.dimensions = dimensions
+        self.limits = EMBEDDING_LIMITS[provider]
+        self._client: AsyncOpenAI | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pid: int | None = None
+
+    def _get_client(self) -> tuple[AsyncOpenAI, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+
+        if self._client is None or self._loop is not loop or self._pid != os.getpid():
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.EMBEDDING_MAX_CONCURRENCY,
+                    max_keepalive_connections=settings.EMBEDDING_MAX_CONCURRENCY,
+                ),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            )
+
+            match self.provider:
+                case "azure-openai":
+                    self._client = AsyncAzureOpenAI(
+                        api_key=settings.AZURE_OPEN_AI_KEY.get_secret_value(),
+                        azure_endpoint=settings.AZURE_OPEN_AI_ENDPOINT,
+                        api_version=settings.AZURE_OPEN_AI_VERSION,
+                        http_client=http_client,
+                        max_retries=0,
+                    )
+                case "openai":
+                    self._client = AsyncOpenAI(
+                        api_key=settings.OPEN_API_KEY.get_secret_value(),
+                        http_client=http_client,
+                        max_retries=0,
+                    )
+                case _:
+                    self._client = AsyncOpenAI(
+                        base_url=f"{settings.EMBEDDING_MODEL_HOST}/v1",
+                        api_key=settings.EMBEDDING_MODEL_SECRET.get_secret_value(),
+                        http_client=http_client,
+                        max_retries=0,
+                    )
+
+            self._semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY)
+            self._loop = loop
+            self._pid = os.getpid()
+
+        return self._client, self._semaphore  # type: ignore
+
+    def _split(self, texts: list[str]) -> list[list[str]]:
+        batches: list[list[str]] = []
+        batch: list[str] = []
+        batch_tokens = 0
+
+        for text in texts:
+            tokens = count_tokens(text)
+
+            if batch and (
+                len(batch) >= self.limits.max_items
+                or batch_tokens + tokens > self.limits.max_tokens
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+
+            batch.append(text)
+            batch_tokens += tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    async def _embed_batch(self, texts: list[str]) -> np.ndarray:
+        client, semaphore = self._get_client()
+
+        for attempt in range(settings.EMBEDDING_MAX_RETRIES + 1):
+            try:
+                async with semaphore:
+                    response = await client.embeddings.create(
+                        input=texts,
+                        model=self.model,
+                        dimensions=self.dimensions or NOT_GIVEN,
+                        encoding_format="base64",
+                    )
+                break
+            except APIError as e:
+                if attempt == settings.EMBEDDING_MAX_RETRIES or not is_retryable(e):
+                    raise e
+
+                delay = get_retry_delay(e, attempt)
+                logger.warning(
+                    f"Embedding request to {self.provider} failed ({e.__class__.__name__}), "
+                    f"retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        data = sorted(response.data, key=lambda item: item.index)
+        return np.vstack(
+            [
+                np.frombuffer(base64.b64decode(item.embedding), dtype=np.float32)  # type: ignore
+                for item in data
+            ]
+        )
+
+    async def _aembed(self, texts: list[str]) -> np.ndarray:
+        batches = self._split(texts)
+
+        logger.debug(
+            f"Embedding {len(texts)} texts in {len(batches)} batches with {self.provider}"
+        )
+
+        results = await asyncio.gather(*[self._embed_batch(b) for b in batches])
+        return np.vstack(results)
+
+    async def aembed(self, texts: list[str]) -> np.ndarray:
+        # Requests always run on the shared background loop, so the connection
+        # pool is reused no matter which event loop (or thread) the caller is on.
+        return await background_loop.arun(self._aembed(texts))
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Blocking variant for synchronous callers (Celery tasks, sync nodes).
+        """
+        return background_loop.run(self._aembed(texts))
+
+
+@lru_cache
+def get_embedding_client(
+    provider: EmbeddingProvider, model: str, dimensions: int | None = None
+) -> EmbeddingClient:
+    return EmbeddingClient(provider=provider, model=model, dimensions=dimensions)
@@ -0,0 +1,481 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Generic, TypeVar
+
+import numpy as np
+from fastembed import SparseEmbedding
+
+from src.core.config import settings
+from src.core.logger import logger
+
+from .embedding import aembed_texts, embed_texts
+from .registry import ModelRegistry, model_registry
+from .schema import MicroBatcherMetrics
+
+I = TypeVar("I")
+O = TypeVar("O")
+
+
+@dataclass
+class _Job(Generic[I, O]):
+    item: I
+    size: int
+    future: "Future[O] | asyncio.Future[O]" = field(default_factory=Future)
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class _BatchStats(Generic[I, O]):
+    """
+    Counters of a batcher, reported as `MicroBatcherMetrics`.
+
+    `seconds_per_unit` is a moving average of the model time per unit, without
+    the time jobs spend queued.
+    """
+
+    SMOOTHING = 0.2
+
+    def __init__(self, name: str, size: Callable[[I], int]) -> None:
+        self.name = name
+        self.size = size
+        self._lock = threading.Lock()
+
+        self._batches = 0
+        self._items = 0
+        self._units = 0
+        self._max_units = 0
+        self._wait_seconds = 0.0
+        self._process_seconds = 0.0
+        self._max_queue_depth = 0
+        self.seconds_per_unit: float | None = None
+
+    def get_metrics(self) -> MicroBatcherMetrics:
+        with self._lock:
+            batches = max(self._batches, 1)
+            items = max(self._items, 1)
+
+            return MicroBatcherMetrics(
+                name=self.name,
+                batches=self._batches,
+                items=self._items,
+                mean_batch_size=self._units / batches,
+                max_batch_size=self._max_units,
+                mean_wait_ms=self._wait_seconds / items * 1000,
+                mean_process_ms=self._process_seconds / batches * 1000,
+                queue_depth=self._get_queue_depth(),
+                max_queue_depth=self._max_queue_depth,
+            )
+
+    def _get_queue_depth(self) -> int:
+        raise NotImplementedError
+
+    def _track_queue_depth(self) -> None:
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._get_queue_depth())
+
+    def _observe(
+        self, batch: list[_Job[I, O]], started_at: float, finished_at: float
+    ) -> None:
+        units = sum(job.size for job in batch)
+
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._units += units
+            self._max_units = max(self._max_units, units)
+            self._wait_seconds += sum(started_at - job.enqueued_at for job in batch)
+            self._process_seconds += finished_at - started_at
+
+    def _observe_latency(self, units: int, seconds: float) -> None:
+        if units == 0:
+            return
+
+        with self._lock:
+            if self.seconds_per_unit is None:
+                self.seconds_per_unit = seconds / units
+            else:
+                self.seconds_per_unit += self.SMOOTHING * (
+                    seconds / units - self.seconds_per_unit
+                )
+
+
+class MicroBatcher(_BatchStats[I, O]):
+    """
+    Coalesces single inference jobs from concurrent requests into batches.
+
+    A worker thread takes the first queued job and keeps collecting until the
+    batch holds `max_batch_size` units (as counted by `size`) or `max_wait`
+    seconds have passed, then runs `process` once over the whole batch. A job
+    larger than the remaining room still joins, so a batch can overshoot by at
+    most one job. The queue is bounded: callers block once it is full.
+
+    Batches run one at a time, which suits local models sharing the CPU.
+    Remote calls go through `AsyncMicroBatcher`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[list[I]], list[O]],
+        *,
+        max_batch_size: int,
+        max_wait: float,
+        max_queue_size: int,
+        size: Callable[[I], int] = lambda _: 1,
+        enabled: bool = True,
+    ) -> None:
+        super().__init__(name, size)
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._queue: queue.Queue[_Job[I, O]] = queue.Queue(maxsize=max_queue_size)
+        self._worker_pid: int | None = None
+
+    def __call__(self, item: I) -> O:
+        if not self.enabled:
+            return self._process_one(item)
+
+        return self.submit(item).result()
+
+    async def acall(self, item: I) -> O:
+        """
+        Async variant of calling the batcher: awaits the batch without holding
+        a thread.
+        """
+        if not self.enabled:
+            return await asyncio.to_thread(self._process_one, item)
+
+        job = self._create_job(item)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            # Wait for room in a thread rather than blocking the event loop
+            await asyncio.to_thread(self._queue.put, job)
+        self._track_queue_depth()
+
+        return await asyncio.wrap_future(job.future)  # type: ignore
+
+    def submit(self, item: I) -> Future[O]:
+        job = self._create_job(item)
+        self._queue.put(job)
+        self._track_queue_depth()
+
+        return job.future  # type: ignore
+
+    def _process_one(self, item: I) -> O:
+        started_at = time.perf_counter()
+        output = self.process([item])[0]
+        self._observe_latency(self.size(item), time.perf_counter() - started_at)
+
+        return output
+
+    def _create_job(self, item: I) -> _Job[I, O]:
+        self._ensure_worker()
+        return _Job(item=item, size=self.size(item))
+
+    def _get_queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_worker(self) -> None:
+        # Threads don't survive a fork, so a forked Celery worker starts its own
+        pid = os.getpid()
+        if self._worker_pid == pid:
+            return
+
+        with self._lock:
+            if self._worker_pid != pid:
+                threading.Thread(
+                    target=self._run, name=f"micro-batcher-{self.name}", daemon=True
+                ).start()
+                self._worker_pid = pid
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self._run_batch()
+            except Exception as e:
+                # The batcher has a single worker, it must outlive any bad batch
+                logger.error(f"Inference batcher '{self.name}' failed: {e}")
+
+    def _run_batch(self) -> None:
+        batch = self._collect()
+
+        if len(batch) == 0:
+            return
+
+        started_at = time.perf_counter()
+        try:
+            outputs = self.process([job.item for job in batch])
+            finished_at = time.perf_counter()
+            if len(outputs) != len(batch):
+                raise ValueError(
+                    f"{self.name} returned {len(outputs)} outputs for {len(batch)} inputs"
+                )
+        except Exception as e:
+            finished_at = time.perf_counter()
+            logger.error(f"Inference batch '{self.name}' failed: {e}")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+        else:
+            self._observe_latency(
+                sum(job.size for job in batch), finished_at - started_at
+            )
+            for job, output in zip(batch, outputs):
+                if not job.future.done():
+                    job.future.set_result(output)
+
+        self._observe(batch, started_at, finished_at)
+
+    def _collect(self) -> list[_Job[I, O]]:
+        """
+        Jobs whose caller went away (e.g. a disconnected chat) are cancelled
+        and left out of the batch.
+        """
+        batch: list[_Job[I, O]] = []
+        units = 0
+        job = self._queue.get()
+        deadline = time.perf_counter() + self.max_wait
+
+        while True:
+            if job.future.set_running_or_notify_cancel():  # type: ignore
+                batch.append(job)
+                units += job.size
+
+            if units >= self.max_batch_size:
+                break
+
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+
+            try:
+                job = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+
+        return batch
+
+
+class AsyncMicroBatcher(_BatchStats[I, O]):
+    """
+    Coalesces jobs like `MicroBatcher`, for remote calls. Jobs are collected
+    on the event loop and every batch runs as its own task, so a slow or
+    retried provider call only holds up the jobs in its batch while later
+    batches go out next to it (the embedding client caps the requests in
+    flight).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[list[I]], Awaitable[list[O]]],
+        *,
+        max_batch_size: int,
+        max_wait: float,
+        size: Callable[[I], int] = lambda _: 1,
+        enabled: bool = True,
+    ) -> None:
+        super().__init__(name, size)
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._pending: list[_Job[I, O]] = []
+        self._pending_units = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def acall(self, item: I) -> O:
+        if not self.enabled:
+            started_at = time.perf_counter()
+            output = (await self.process([item]))[0]
+            self._observe_latency(self.size(item), time.perf_counter() - started_at)
+
+            return output
+
+        loop = asyncio.get_running_loop()
+        job = _Job[I, O](item=item, size=self.size(item), future=loop.create_future())
+        self._pending.append(job)
+        self._pending_units += job.size
+        self._track_queue_depth()
+
+        if self._pending_units >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await job.future
+
+    def _get_queue_depth(self) -> int:
+        return len(self._pending)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # Jobs whose caller went away (e.g. a disconnected chat) are left out
+        batch = [job for job in self._pending if not job.future.cancelled()]
+        self._pending = []
+        self._pending_units = 0
+
+        if len(batch) == 0:
+            return
+
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[_Job[I, O]]) -> None:
+        started_at = time.perf_counter()
+        try:
+            outputs = await self.process([job.item for job in batch])
+            finished_at = time.perf_counter()
+            if len(outputs) != len(batch):
+                raise ValueError(
+                    f"{self.name} returned {len(outputs)} outputs for {len(batch)} inputs"
+                )
+        except Exception as e:
+            finished_at = time.perf_counter()
+            logger.error(f"Inference batch '{self.name}' failed: {e}")
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+        else:
+            self._observe_latency(
+                sum(job.size for job in batch), finished_at - started_at
+            )
+            for job, output in zip(batch, outputs):
+                if not job.future.done():
+                    job.future.set_result(output)
+
+        self._observe(batch, started_at, finished_at)
+
+
+class InferenceService:
+    """
+    In-process inference for the chat path. Query embeddings and rerank
+    scores of concurrent requests are computed in shared micro-batches, so
+    each local model runs one larger ONNX call instead of many tiny ones
+    competing for the same cores. Provider query embeddings are batched on
+    the event loop, where several batches can wait on the provider at once.
+    """
+
+    def __init__(self, models: ModelRegistry) -> None:
+        self.models = models
+
+        options = dict(
+            max_wait=settings.INFERENCE_MAX_WAIT_MS / 1000,
+            max_queue_size=settings.INFERENCE_MAX_QUEUE_SIZE,
+            enabled=settings.INFERENCE_BATCHING_ENABLED,
+        )
+
+        self.query_embedding = AsyncMicroBatcher[str, np.ndarray](
+            "query_embedding",
+            self._aembed_texts,
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            max_wait=settings.INFERENCE_MAX_WAIT_MS / 1000,
+            enabled=settings.INFERENCE_BATCHING_ENABLED,
+        )
+        self.sparse_query_embedding = MicroBatcher[str, SparseEmbedding](
+            "sparse_query_embedding",
+            lambda texts: list(self.models.sparse_embedding.query_embed(texts)),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            **options,  # type: ignore
+        )
+        self.dense_query_embedding = MicroBatcher[str, np.ndarray](
+            "dense_query_embedding",
+            lambda texts: list(self.models.dense_embedding.query_embed(texts)),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            **options,  # type: ignore
+        )
+        self.colbert_query_embedding = MicroBatcher[str, np.ndarray](
+            "colbert_query_embedding",
+            lambda texts: list(self.models.colbert_embedding.query_embed(texts)),
+            max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+            **options,  # type: ignore
+        )
+        # Batched by (query, document) pairs, so jobs of different queries
+        # share a single cross-encoder call
+        self.rerank_scores = MicroBatcher[tuple[str, list[str]], list[float]](
+            "rerank",
+            self._rerank,
+            max_batch_size=settings.INFERENCE_RERANK_MAX_BATCH_SIZE,
+            size=lambda job: len(job[1]),
+            **options,  # type: ignore
+        )
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return embed_texts([text])[0]
+
+    def embed_sparse_query(self, text: str) -> SparseEmbedding:
+        return self.sparse_query_embedding(text)
+
+    def embed_dense_query(self, text: str) -> np.ndarray:
+        return self.dense_query_embedding(text)
+
+    def embed_colbert_query(self, text: str) -> np.ndarray:
+        return self.colbert_query_embedding(text)
+
+    def rerank(self, query: str, documents: list[str]) -> list[float]:
+        if len(documents) == 0:
+            return []
+
+        return self.rerank_scores((query, documents))
+
+    async def aembed_query(self, text: str) -> np.ndarray:
+        return await self.query_embedding.acall(text)
+
+    async def aembed_sparse_query(self, text: str) -> SparseEmbedding:
+        return await self.sparse_query_embedding.acall(text)
+
+    async def aembed_dense_query(self, text: str) -> np.ndarray:
+        return await self.dense_query_embedding.acall(text)
+
+    async def aembed_colbert_query(self, text: str) -> np.ndarray:
+        return await self.colbert_query_embedding.acall(text)
+
+    async def arerank(self, query: str, documents: list[str]) -> list[float]:
+        if len(documents) == 0:
+            return []
+
+        return await self.rerank_scores.acall((query, documents))
+
+    def get_metrics(self) -> list[MicroBatcherMetrics]:
+        return [
+            batcher.get_metrics()
+            for batcher in (
+                self.query_embedding,
+                self.sparse_query_embedding,
+                self.dense_query_embedding,
+                self.colbert_query_embedding,
+                self.rerank_scores,
+            )
+        ]
+
+    @staticmethod
+    async def _aembed_texts(texts: list[str]) -> list[np.ndarray]:
+        return list(await aembed_texts(texts))
+
+    def _rerank(self, jobs: list[tuple[str, list[str]]]) -> list[list[float]]:
+        pairs = [
+            (query, document) for query, documents in jobs for document in documents
+        ]
+        scores = list(self.models.reranker.rerank_pairs(pairs, batch_size=len(pairs)))
+
+        results = []
+        offset = 0
+        for _, documents in jobs:
+            results.append(scores[offset : offset + len(documents)])
+            offset += len(documents)
+
+        return results
+
+
+inference_service = InferenceService(model_registry)
@@ -0,0 +1,102 @@
+import threading
+from typing import Any, Callable, TypeVar
+
+from fastembed import LateInteractionTextEmbedding, SparseTextEmbedding, TextEmbedding
+from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+from src.core.config import settings
+from src.core.logger import logger
+
+DENSE_EMBEDDING_MODEL = "BAAI/bge-small-en"
+COLBERT_EMBEDDING_MODEL = "colbert-ir/colbertv2.0"
+SPARSE_EMBEDDING_MODEL = "Qdrant/bm25"
+RERANKER_MODEL = "jinaai/jina-reranker-v2-base-multilingual"
+
+T = TypeVar("T")
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of local fastembed models.
+
+    Models are loaded lazily on first use and shared by every controller,
+    node and task in the process. Loading is guarded by a lock so concurrent
+    requests never build the same ONNX session twice.
+    """
+
+    def __init__(self) -> None:
+        self._models: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], T]) -> T:
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                logger.info(f"Loading model '{name}'")
+                model = factory()
+                self._models[name] = model
+
+        return model
+
+    @property
+    def dense_embedding(self) -> TextEmbedding:
+        return self._get_or_create(
+            DENSE_EMBEDDING_MODEL,
+            lambda: TextEmbedding(
+                DENSE_EMBEDDING_MODEL,
+                cache_dir=settings.FASTEMBED_CACHE_DIR,
+                threads=settings.FASTEMBED_THREADS,
+            ),
+        )
+
+    @property
+    def colbert_embedding(self) -> LateInteractionTextEmbedding:
+        return self._get_or_create(
+            COLBERT_EMBEDDING_MODEL,
+            lambda: LateInteractionTextEmbedding(
+                COLBERT_EMBEDDING_MODEL,
+                cache_dir=settings.FASTEMBED_CACHE_DIR,
+                threads=settings.FASTEMBED_THREADS,
+            ),
+        )
+
+    @property
+    def sparse_embedding(self) -> SparseTextEmbedding:
+        return self._get_or_create(
+            SPARSE_EMBEDDING_MODEL,
+            lambda: SparseTextEmbedding(
+                SPARSE_EMBEDDING_MODEL,
+                cache_dir=settings.FASTEMBED_CACHE_DIR,
+                threads=settings.FASTEMBED_THREADS,
+            ),
+        )
+
+    @property
+    def reranker(self) -> TextCrossEncoder:
+        return self._get_or_create(
+            RERANKER_MODEL,
+            lambda: TextCrossEncoder(
+                RERANKER_MODEL,
+                cache_dir=settings.FASTEMBED_CACHE_DIR,
+                threads=settings.RERANKER_THREADS or settings.FASTEMBED_THREADS,
+            ),
+        )
+
+    def warm_up(self, *, reranker: bool = True) -> None:
+        """
+        Eagerly load the models, e.g. on API startup or in a freshly forked
+        Celery worker process. Workers never rerank, so they can skip it.
+        """
+        self.dense_embedding
+        self.colbert_embedding
+        self.sparse_embedding
+
+        if reranker:
+            self.reranker
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+from src.core.config import settings
+from src.core.logger import logger
+
+from .inference import InferenceService, inference_service
+
+
+class Reranker:
+    """
+    Cross-encoder reranking in batches under a latency budget.
+
+    The rerank batcher's moving average of model time per document decides up
+    front how many of the hits fit in the remaining budget. When fewer than
+    the requested number of hits can be reranked in time, the hits keep their
+    vector store order and nothing is scored on the request. Instead, at most
+    once per `probe_interval` seconds, one batch of those hits is scored in
+    the background, so the estimate recovers from a latency spike rather than
+    disabling reranking for good.
+    """
+
+    def __init__(
+        self, inference: InferenceService, batch_size: int, probe_interval: float
+    ) -> None:
+        self.inference = inference
+        self.batch_size = batch_size
+        self.probe_interval = probe_interval
+        self._probe: asyncio.Task | None = None
+        self._probed_at = float("-inf")
+
+    async def arerank(
+        self,
+        query: str,
+        documents: list[str],
+        limit: int,
+        deadline: float | None = None,
+    ) -> list[int]:
+        """
+        Indices of the `limit` best documents, best first. `deadline` is a
+        `time.perf_counter()` value the reranking has to finish by.
+        """
+        limit = min(limit, len(documents))
+        size = self._get_affordable_size(len(documents), deadline)
+
+        if size < limit:
+            logger.debug(
+                f"{size} of {len(documents)} documents fit in the rerank budget, "
+                "keeping the vector store order"
+            )
+            self._schedule_probe(query, documents)
+            return list(range(limit))
+
+        scores: list[float] = []
+
+        for start in range(0, size, self.batch_size):
+            if deadline is not None and scores and time.perf_counter() > deadline:
+                break
+
+            batch = documents[start : min(start + self.batch_size, size)]
+            scores.extend(await self.inference.arerank(query, batch))
+
+        if len(scores) < limit:
+            logger.debug(f"Rerank ran out of budget after {len(scores)} documents")
+            return list(range(limit))
+
+        ranking = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        return ranking[:limit]
+
+    def _schedule_probe(self, query: str, documents: list[str]) -> None:
+        """
+        Score one batch off the request path to refresh the latency estimate.
+        """
+        now = time.perf_counter()
+        if self._probe is not None and not self._probe.done():
+            return
+        if now - self._probed_at < self.probe_interval:
+            return
+
+        self._probed_at = now
+        self._probe = asyncio.get_running_loop().create_task(
+            self._run_probe(query, documents[: self.batch_size])
+        )
+
+    async def _run_probe(self, query: str, documents: list[str]) -> None:
+        try:
+            await self.inference.arerank(query, documents)
+        except Exception as e:
+            logger.warning(f"Rerank latency probe failed: {e}")
+
+    def _get_affordable_size(self, size: int, deadline: float | None) -> int:
+        seconds_per_document = self.inference.rerank_scores.seconds_per_unit
+
+        if deadline is None or not seconds_per_document:
+            return size
+
+        remaining = deadline - time.perf_counter()
+        return max(0, min(size, int(remaining / seconds_per_document)))
+
+
+reranker = Reranker(
+    inference_service,
+    batch_size=settings.RERANKER_BATCH_SIZE,
+    probe_interval=settings.RERANKER_PROBE_INTERVAL_SECONDS,
+)
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from src.core.dependencies import CurrentUser
+
+from .inference import inference_service
+from .schema import MicroBatcherMetrics
+
+router = APIRouter(prefix="/inference", tags=["Inference"])
+
+
+@router.get("/metrics", response_model=list[MicroBatcherMetrics])
+def get_inference_metrics(user: CurrentUser):
+    return inference_service.get_metrics()
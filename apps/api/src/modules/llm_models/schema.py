@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class MicroBatcherMetrics(BaseModel):
+    """
+    Counters of one inference micro-batcher since process start. Batch sizes
+    are in the batcher's units (texts, or query-document pairs for rerank).
+    """
+
+    name: str
+    batches: int
+    items: int
+    mean_batch_size: float
+    max_batch_size: int
+    mean_wait_ms: float
+    mean_process_ms: float
+    queue_depth: int
+    max_queue_depth: int
@@ -1,3 +1,7 @@
+from uuid import UUID
+
+from sqlmodel import col
+
 from src.core.repository.base import BaseRepository
 from src.models.models import User
 
@@ -6,3 +10,14 @@ class UserRepository(BaseRepository[User]):
     def get_by_email(self, email: str) -> User | None:
         response = self.get_by(field="email", value=email, unique=True)
         return response
+
+    def get_page(self, *, after: UUID | None, limit: int) -> list[User]:
+        """
+        Users ordered by id, paged by the last id seen.
+        """
+        statement = self._query().order_by(col(self.model_class.id)).limit(limit)
+
+        if after is not None:
+            statement = statement.where(col(self.model_class.id) > after)
+
+        return list(self.session.exec(statement).all())
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import threading
+from typing import Any, Coroutine, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundEventLoop:
+    """
+    An event loop running in a daemon thread, so synchronous code (Celery
+    tasks, sync graph nodes) can share long-lived async clients and their
+    connection pools. The loop is recreated after a fork.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is not None and self._pid == os.getpid():
+            return self._loop
+
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="background-event-loop", daemon=True
+                )
+                thread.start()
+
+                self._loop = loop
+                self._pid = os.getpid()
+
+        return self._loop
+
+    def run(self, coroutine: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """
+        Run a coroutine on the background loop and block until it finishes.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return future.result(timeout)
+
+    async def arun(self, coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Await a coroutine on the background loop from any other event loop.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return await asyncio.wrap_future(future)
+
+
+background_loop = BackgroundEventLoop()
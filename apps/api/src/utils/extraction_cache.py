@@ -0,0 +1,69 @@
+import hashlib
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from redis import Redis
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.logger import logger
+from src.core.redis import redis_client
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class ExtractionCache(Generic[T]):
+    """
+    Content-addressed cache for structured LLM extractions, keyed by
+    (model, prompt version, sha256(content)). Only validated models are
+    stored, so a hit can be used as is. Redis errors degrade to a miss.
+    """
+
+    def __init__(
+        self, client: Redis | None, schema: type[T], prefix: str, ttl: int | None
+    ) -> None:
+        self.client = client
+        self.schema = schema
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def make_key(self, model: str, prompt_version: str, content: str) -> str:
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return f"extraction:{self.prefix}:{model}:{prompt_version}:{digest}"
+
+    def get(self, key: str) -> T | None:
+        if self.client is None:
+            return None
+
+        try:
+            value: bytes | None = self.client.get(key)  # type: ignore
+        except RedisError as e:
+            logger.warning(f"Extraction cache unavailable: {e}")
+            return None
+
+        if value is None:
+            return None
+
+        try:
+            return self.schema.model_validate_json(value)
+        except ValidationError as e:
+            logger.warning(f"Dropping invalid extraction cache entry {key}: {e}")
+            return None
+
+    def set(self, key: str, value: T) -> None:
+        if self.client is None:
+            return
+
+        try:
+            self.client.set(key, value.model_dump_json(), ex=self.ttl)
+        except RedisError as e:
+            logger.warning(f"Extraction cache unavailable: {e}")
+
+
+def create_extraction_cache(schema: type[T], prefix: str) -> ExtractionCache[T]:
+    return ExtractionCache(
+        client=redis_client if settings.EXTRACTION_CACHE_ENABLED else None,
+        schema=schema,
+        prefix=prefix,
+        ttl=settings.EXTRACTION_CACHE_TTL_SECONDS,
+    )
@@ -0,0 +1,202 @@
+"""
+MinHash signatures and LSH banding for near-duplicate detection of document
+text. Signatures are `NUM_PERMUTATIONS` uint32 minimums over word shingles;
+two documents whose signatures agree on every row of at least one band land
+in the same bucket and are compared on their estimated Jaccard similarity.
+
+With 16 bands of 8 rows, pairs at 0.8 Jaccard share a bucket ~95% of the
+time and pairs below 0.5 almost never do.
+"""
+
+import hashlib
+import re
+import zlib
+from collections import defaultdict
+from typing import Hashable, Iterable, Sequence, TypeVar
+
+import numpy as np
+
+NUM_PERMUTATIONS = 128
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 5
+
+# Shingles are hashed in blocks so very long documents don't materialize a
+# (shingles x permutations) matrix at once.
+_BLOCK_SIZE = 4096
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+_rng = np.random.default_rng(1)
+# a, b < 2**32 and hashes < 2**32, so a * hash + b never overflows uint64
+_A = _rng.integers(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+K = TypeVar("K", bound=Hashable)
+
+
+def get_shingles(text: str) -> set[str]:
+    tokens = [word.lower() for word in _TOKEN_PATTERN.findall(text)]
+
+    if len(tokens) <= SHINGLE_SIZE:
+        return {" ".join(tokens)} if tokens else set()
+
+    return {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+
+
+class MinHasher:
+    """
+    MinHash signature of a text fed piece by piece, e.g. page by page while
+    it is extracted, so the whole text is never held. The signature is the
+    one `get_signature` gives for the concatenated pieces: words cut at the
+    end of a piece and the last `SHINGLE_SIZE - 1` words are carried over.
+    """
+
+    def __init__(self) -> None:
+        self._signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+        self._tail: list[str] = []
+        self._partial = ""
+        self._count = 0
+
+    def update(self, text: str) -> None:
+        text = self._partial + text
+        words = _TOKEN_PATTERN.findall(text)
+
+        # A word running up to the end may go on in the next piece
+        if words and _TOKEN_PATTERN.match(text, len(text) - 1):
+            self._partial = words.pop()
+        else:
+            self._partial = ""
+
+        # Words are lowercased one by one: lowercasing a whole piece depends on
+        # where it was cut (e.g. a final sigma)
+        tokens = [word.lower() for word in words]
+
+        self._count += len(tokens)
+        window = self._tail + tokens
+        _update_signature(
+            self._signature,
+            (
+                " ".join(window[i : i + SHINGLE_SIZE])
+                for i in range(len(window) - SHINGLE_SIZE + 1)
+            ),
+        )
+        self._tail = window[-(SHINGLE_SIZE - 1) :]
+
+    def signature(self) -> list[int] | None:
+        """
+        Signature of everything fed so far, or `None` when it has no words.
+        """
+        window = self._tail + ([self._partial.lower()] if self._partial else [])
+        count = self._count + bool(self._partial)
+
+        if count == 0:
+            return None
+
+        if count < SHINGLE_SIZE:
+            # Too short for a full shingle, all words make one
+            shingles = [" ".join(window)]
+        elif self._partial:
+            shingles = [" ".join(window[-SHINGLE_SIZE:])]
+        else:
+            shingles = []
+
+        signature = self._signature.copy()
+        _update_signature(signature, shingles)
+
+        return signature.tolist()
+
+
+def get_signature(text: str) -> list[int] | None:
+    """
+    MinHash signature of the text, or `None` when it has no words.
+    """
+    hasher = MinHasher()
+    hasher.update(text)
+
+    return hasher.signature()
+
+
+def _update_signature(signature: np.ndarray, shingles: Iterable[str]) -> None:
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+    )
+
+    for start in range(0, len(hashes), _BLOCK_SIZE):
+        block = hashes[start : start + _BLOCK_SIZE, np.newaxis]
+        values = ((block * _A + _B) % _MERSENNE_PRIME) & _MAX_HASH
+        np.minimum(signature, values.min(axis=0), out=signature)
+
+
+def get_bands(signature: Sequence[int]) -> list[int]:
+    """
+    One signed 64-bit bucket hash per band. The band index is part of the
+    hash, so equal rows in different bands never collide.
+    """
+    rows = np.asarray(signature, dtype=np.uint32)
+
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                band.to_bytes(2, "little")
+                + rows[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND].tobytes(),
+                digest_size=8,
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def get_similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """
+    Estimated Jaccard similarity of the shingle sets behind two signatures.
+    """
+    return float(np.mean(np.asarray(a) == np.asarray(b)))
+
+
+def get_clusters(
+    signatures: Iterable[tuple[K, Sequence[int]]], threshold: float
+) -> list[list[K]]:
+    """
+    Group keys whose signatures are at least `threshold` similar, following
+    similarity transitively. Only pairs sharing an LSH bucket are compared.
+    Singletons are left out.
+    """
+    items = dict(signatures)
+    parents: dict[K, K] = {key: key for key in items}
+
+    def find(key: K) -> K:
+        while parents[key] != key:
+            parents[key] = parents[parents[key]]
+            key = parents[key]
+        return key
+
+    buckets: dict[int, list[K]] = defaultdict(list)
+    for key, signature in items.items():
+        for bucket in get_bands(signature):
+            buckets[bucket].append(key)
+
+    compared: set[tuple[K, K]] = set()
+    for keys in buckets.values():
+        for i, a in enumerate(keys):
+            for b in keys[i + 1 :]:
+                if (a, b) in compared or find(a) == find(b):
+                    continue
+                compared.add((a, b))
+
+                if get_similarity(items[a], items[b]) >= threshold:
+                    parents[find(b)] = find(a)
+
+    clusters: dict[K, list[K]] = defaultdict(list)
+    for key in items:
+        clusters[find(key)].append(key)
+
+    return [cluster for cluster in clusters.values() if len(cluster) > 1]
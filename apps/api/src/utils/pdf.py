@@ -0,0 +1,134 @@
+import os
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Iterator
+
+import pymupdf
+from billiard.pool import Pool
+
+PAGE_SEPARATOR = chr(12)
+
+
+def get_page_count(file_path: Path) -> int:
+    with pymupdf.open(file_path.resolve()) as doc:
+        return doc.page_count
+
+
+def iter_page_texts(file_path: Path) -> Iterator[str]:
+    """
+    Lazily yield the text of each page of a PDF. Only one page is held in
+    memory at a time.
+    """
+    doc = pymupdf.open(file_path.resolve())
+
+    try:
+        for page in doc:
+            yield page.get_text()  # type: ignore
+    finally:
+        doc.close()
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> list[str]:
+    # Each worker opens the file itself, so no document is ever pickled.
+    with pymupdf.open(file_path) as doc:
+        return [doc[index].get_text() for index in range(start, stop)]  # type: ignore
+
+
+class ExtractionPool:
+    """
+    The process pool used for sharded extraction. It is created on first use
+    in every process and reused for every document after that, so a document
+    doesn't pay for forking workers. `workers` is set once per Celery worker,
+    from the CPUs left to each of its concurrent tasks; below two workers
+    documents are extracted serially. The pool keeps the size it was created
+    with.
+    """
+
+    def __init__(self) -> None:
+        self.workers = 1
+        self.size = 0
+        self._pool: Pool | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+
+    def configure(self, workers: int) -> None:
+        self.workers = max(workers, 1)
+
+    def get(self, workers: int | None = None) -> Pool:
+        if self._pool is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pid != os.getpid():
+                    self.size = workers or self.workers
+                    self._pool = Pool(processes=self.size)
+                    self._pid = os.getpid()
+
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None and self._pid == os.getpid():
+            self._pool.terminate()
+            self._pool = None
+
+
+extraction_pool = ExtractionPool()
+
+
+def iter_document_pages(
+    file_path: Path,
+    *,
+    parallel_min_pages: int,
+    workers: int | None = None,
+    pages_per_shard: int = 25,
+) -> Iterator[str]:
+    """
+    Yield page texts serially, or in the process pool for documents with at
+    least `parallel_min_pages` pages when it has two workers or more.
+    """
+    workers = workers or extraction_pool.workers
+
+    if (
+        workers > 1
+        and parallel_min_pages > 0
+        and get_page_count(file_path) >= parallel_min_pages
+    ):
+        return iter_page_texts_parallel(
+            file_path, workers=workers, pages_per_shard=pages_per_shard
+        )
+
+    return iter_page_texts(file_path)
+
+
+def iter_page_texts_parallel(
+    file_path: Path,
+    *,
+    workers: int | None = None,
+    pages_per_shard: int = 25,
+) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF, in order, extracting page ranges in
+    the process's extraction pool.
+
+    Uses billiard (Celery's fork of multiprocessing) because Celery's prefork
+    workers are daemonic and the standard library refuses to fork from them.
+    At most two shards per worker are in flight, so memory stays bounded.
+    """
+    path = str(file_path.resolve())
+    page_count = get_page_count(file_path)
+    shards = [
+        (path, start, min(start + pages_per_shard, page_count))
+        for start in range(0, page_count, pages_per_shard)
+    ]
+
+    pool = extraction_pool.get(workers)
+    window = 2 * extraction_pool.size
+    pending = deque()
+
+    for shard in shards:
+        pending.append(pool.apply_async(_extract_page_range, shard))
+
+        if len(pending) >= window:
+            yield from pending.popleft().get()
+
+    while pending:
+        yield from pending.popleft().get()
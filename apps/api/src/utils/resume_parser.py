@@ -1,13 +1,20 @@
 import re
 from datetime import datetime
+from functools import lru_cache
 from typing import List, Optional, cast
 
 import spacy
 from langchain.messages import HumanMessage, SystemMessage
 from pydantic import BaseModel, EmailStr, Field, field_validator
+from spacy.language import Language
 from spacy.matcher import Matcher
+from spacy.tokens import Doc
 
+from src.core.config import settings
+from src.core.logger import logger
 from src.modules.llm_models.model import LlmModelFactory
+from src.modules.llm_models.types import LlmModelName
+from src.utils.extraction_cache import create_extraction_cache
 
 
 class CandidateExperience(BaseModel):
@@ -84,10 +91,67 @@ class ResumeMetadata(BaseModel):
         return v
 
 
+@lru_cache(maxsize=1)
+def _get_name_pipeline() -> tuple[Language, Matcher]:
+    """
+    Load spaCy once per process. Name matching only needs POS tags, so NER,
+    the dependency parser and the lemmatizer are disabled.
+    """
+    nlp = spacy.load("en_core_web_sm", disable=["ner", "parser", "lemmatizer"])
+    matcher = Matcher(nlp.vocab)
+
+    # Define name patterns
+    patterns = [
+        [{"POS": "PROPN"}, {"POS": "PROPN"}],  # First name and Last name
+        [
+            {"POS": "PROPN"},
+            {"POS": "PROPN"},
+            {"POS": "PROPN"},
+        ],  # First name, Middle name, and Last name
+        [
+            {"POS": "PROPN"},
+            {"POS": "PROPN"},
+            {"POS": "PROPN"},
+            {"POS": "PROPN"},
+        ],  # First name, Middle name, Middle name, and Last name
+        # Add more patterns as needed
+    ]
+
+    for pattern in patterns:
+        matcher.add("NAME", patterns=[pattern])
+
+    return nlp, matcher
+
+
+def _match_name(doc: Doc, matcher: Matcher) -> str | None:
+    matches = matcher(doc)
+
+    for match_id, start, end in matches:
+        span = doc[start:end]
+        return span.text
+
+    return None
+
+
+resume_extraction_cache = create_extraction_cache(ResumeMetadata, prefix="resume")
+
+
 class ResumeParser:
-    def __init__(self):
+    NAME_HEADER_CHARACTERS = 500
+
+    # Bump whenever the prompt or `ResumeMetadata` changes, so cached
+    # extractions made with the old one are not reused.
+    PROMPT_VERSION = "2"
+    SYSTEM_PROMPT = (
+        "You are a expert in reading a resume of a candidate and extract the relevant information\n"
+        "The user message contains the content of the resume of the candidate between <CONTENT> tags\n"
+        "Make sure you capture all the unique skills the candidate has"
+    )
+
+    def __init__(self, model_name: LlmModelName = settings.DEFAULT_LLM):
+        self.model_name = model_name
         self.model_factory = LlmModelFactory()
-        self.llm = self.model_factory.get_model()
+        self.llm = self.model_factory.get_model(model_name)
 
     @staticmethod
     def extract_email_from_resume(text: str):
@@ -103,37 +167,30 @@ class ResumeParser:
 
     @staticmethod
     def extract_name(resume_text: str):
-        nlp = spacy.load("en_core_web_sm")
-        matcher = Matcher(nlp.vocab)
-
-        # Define name patterns
-        patterns = [
-            [{"POS": "PROPN"}, {"POS": "PROPN"}],  # First name and Last name
-            [
-                {"POS": "PROPN"},
-                {"POS": "PROPN"},
-                {"POS": "PROPN"},
-            ],  # First name, Middle name, and Last name
-            [
-                {"POS": "PROPN"},
-                {"POS": "PROPN"},
-                {"POS": "PROPN"},
-                {"POS": "PROPN"},
-            ],  # First name, Middle name, Middle name, and Last name
-            # Add more patterns as needed
-        ]
-
-        for pattern in patterns:
-            matcher.add("NAME", patterns=[pattern])
-
-        doc = nlp(resume_text)
-        matches = matcher(doc)
-
-        for match_id, start, end in matches:
-            span = doc[start:end]
-            return span.text
-
-        return None
+        nlp, matcher = _get_name_pipeline()
+        doc = nlp(ResumeParser._get_header(resume_text))
+        return _match_name(doc, matcher)
+
+    @staticmethod
+    def extract_names(
+        resume_texts: list[str], *, batch_size: int = 64, n_process: int = 1
+    ) -> list[str | None]:
+        """
+        Batch version of `extract_name` built on `nlp.pipe`, for bulk
+        re-extraction over many resumes.
+        """
+        nlp, matcher = _get_name_pipeline()
+        docs = nlp.pipe(
+            (ResumeParser._get_header(text) for text in resume_texts),
+            batch_size=batch_size,
+            n_process=n_process,
+        )
+        return [_match_name(doc, matcher) for doc in docs]
+
+    @staticmethod
+    def _get_header(resume_text: str) -> str:
+        # The name is almost always at the top, so only tag the first part
+        return resume_text[: ResumeParser.NAME_HEADER_CHARACTERS]
 
     @staticmethod
     def extract_contact_number_from_resume(text: str):
@@ -148,18 +205,27 @@ class ResumeParser:
         return contact_number
 
     def extract_resume_details(self, content: str) -> ResumeMetadata:
-        prompt = (
-            "You are a expert in reading a resume of a candidate and extract the relevant information\n"
-            "Below is the content of the resume of the candidate\n"
-            "Make sure you capture all the unique skills the candidate has\n"
-            "<CONTENT>\n{content}</CONTENT>"
+        """
+        Structured extraction of the resume with the LLM. Results are cached
+        by model, prompt version and content hash, so the same resume is only
+        sent to the model once.
+        """
+        key = resume_extraction_cache.make_key(
+            self.model_name, self.PROMPT_VERSION, content
         )
-        prompt = prompt.format(content=content)
-        message = SystemMessage(content=prompt)
-        user_message = HumanMessage(content="<CONTENT>\n{content}</CONTENT>")
+        cached = resume_extraction_cache.get(key)
+
+        if cached is not None:
+            logger.debug(f"Resume extraction cache hit for {key}")
+            return cached
+
+        message = SystemMessage(content=self.SYSTEM_PROMPT)
+        user_message = HumanMessage(content=f"<CONTENT>\n{content}</CONTENT>")
         response = self.llm.with_structured_output(ResumeMetadata).invoke(
             input=[message, user_message]
         )
         response = cast(ResumeMetadata, response)
 
+        resume_extraction_cache.set(key, response)
+
         return response
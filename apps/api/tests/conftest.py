@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+from qdrant_client import QdrantClient
+
+from src.core.vector_db import CollectionBootstrap
+
+
+class FakeRedis:
+    """
+    The subset of the Redis client used by collection bootstrapping and
+    re-index state, kept in memory.
+    """
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.sets: dict[str, set[bytes]] = {}
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def hgetall(self, key: str):
+        return dict(self.hashes.get(key, {}))
+
+    def hset(self, key: str, field: str, value) -> None:
+        self.hashes.setdefault(key, {})[self._encode(field)] = self._encode(value)
+
+    def exists(self, *keys: str) -> int:
+        return sum(key in self.hashes or key in self.sets for key in keys)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.hashes.pop(key, None)
+            self.sets.pop(key, None)
+
+    def sadd(self, key: str, *values) -> None:
+        self.sets.setdefault(key, set()).update(self._encode(v) for v in values)
+
+    def smembers(self, key: str) -> set[bytes]:
+        return set(self.sets.get(key, set()))
+
+    def spop(self, key: str, count: int) -> list[bytes]:
+        members = self.sets.get(key, set())
+        return [members.pop() for _ in range(min(count, len(members)))]
+
+    def lock(self, name: str, **kwargs):
+        return threading.Lock()
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def vector_db():
+    return QdrantClient(":memory:")
+
+
+@pytest.fixture
+def bootstrap(vector_db, fake_redis):
+    return CollectionBootstrap(vector_db, fake_redis)  # type: ignore
@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from qdrant_client.models import PointStruct
+
+from src.core.config import settings
+from src.core.vector_db import ReindexState, VectorCollectionConfigError
+from src.modules.knowledge_base import controller as controller_module
+from src.modules.knowledge_base.controller import KnowledgeBaseController
+
+COLLECTION = "knowledge_base_test"
+
+
+@pytest.fixture
+def knowledge_base(monkeypatch, vector_db, fake_redis, bootstrap):
+    monkeypatch.setattr(settings, "VECTOR_DB_MULTITENANT", True)
+    monkeypatch.setattr(settings, "VECTOR_DB_KNOWLEDGE_BASE_COLLECTION", COLLECTION)
+    monkeypatch.setattr(controller_module, "redis_client", fake_redis)
+    monkeypatch.setattr(controller_module, "collection_bootstrap", bootstrap)
+    monkeypatch.setattr(controller_module, "get_embedding_size", lambda: 4)
+
+    return KnowledgeBaseController(repository=MagicMock(), vector_db=vector_db)
+
+
+@pytest.fixture
+def reindexing(monkeypatch, knowledge_base, bootstrap, fake_redis):
+    """
+    A live collection of 4-dimensional vectors being rebuilt after the
+    embedding size was changed to 8.
+    """
+    bootstrap.ensure(COLLECTION, knowledge_base._get_collection_spec())
+    live = bootstrap.resolve(COLLECTION)
+    bootstrap._known.clear()
+
+    monkeypatch.setattr(controller_module, "get_embedding_size", lambda: 8)
+    spec = knowledge_base._get_collection_spec()
+    target = bootstrap.get_versioned_name(COLLECTION, spec)
+    bootstrap.create(target, spec)
+
+    state = ReindexState(fake_redis, COLLECTION)  # type: ignore
+    state.start(target)
+
+    return SimpleNamespace(live=live, target=target, state=state)
+
+
+def make_file(content: str):
+    file_id = uuid4()
+    document = SimpleNamespace(
+        id=uuid4(), file_id=file_id, content=content, ingest_manifest=None
+    )
+    return SimpleNamespace(
+        id=file_id,
+        owner_id=uuid4(),
+        original_filename="resume.pdf",
+        knowledge_base_document=document,
+    )
+
+
+def test_ingest_during_dimension_changing_reindex_is_deferred(
+    monkeypatch, knowledge_base, reindexing, vector_db, fake_redis
+):
+    embed_texts = MagicMock()
+    monkeypatch.setattr(controller_module, "embed_texts", embed_texts)
+    file = make_file("Python developer with ten years of experience.")
+
+    knowledge_base.ingest_documents(MagicMock(), [file])  # type: ignore
+
+    assert fake_redis.smembers(reindexing.state.dirty_key) == {file.id.hex.encode()}
+    assert vector_db.count(reindexing.live).count == 0
+    embed_texts.assert_not_called()
+    knowledge_base.repository.update.assert_not_called()
+
+
+def test_delete_during_dimension_changing_reindex_marks_file_dirty(
+    knowledge_base, reindexing, vector_db, fake_redis
+):
+    file = make_file("Python developer with ten years of experience.")
+    document = file.knowledge_base_document
+    document.candidate = None
+    knowledge_base.repository.get_by.return_value = document
+    vector_db.upsert(
+        reindexing.live,
+        points=[
+            PointStruct(
+                id=str(uuid4()),
+                vector=[0.1, 0.2, 0.3, 0.4],
+                payload={"file_id": file.id.hex},
+            )
+        ],
+    )
+
+    knowledge_base.remove_knowledge_base_document(document.id, MagicMock(), MagicMock())  # type: ignore
+
+    assert fake_redis.smembers(reindexing.state.dirty_key) == {file.id.hex.encode()}
+    assert vector_db.count(reindexing.live).count == 0
+    knowledge_base.repository.delete.assert_called_once_with(document)
+
+
+def test_live_collection_is_still_refused_outside_a_reindex(
+    knowledge_base, reindexing, fake_redis
+):
+    reindexing.state.finish()
+
+    with pytest.raises(VectorCollectionConfigError):
+        knowledge_base.ingest_documents(
+            MagicMock(),
+            [make_file("Python developer with ten years of experience.")],  # type: ignore
+        )
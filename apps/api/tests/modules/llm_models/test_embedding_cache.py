@@ -0,0 +1,43 @@
+import numpy as np
+from redis.exceptions import ConnectionError
+
+from src.modules.llm_models import embedding_cache as module
+from src.modules.llm_models.embedding_cache import EmbeddingCache
+
+
+class MemoryStore:
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    def get_many(self, keys):
+        if self.down:
+            raise ConnectionError("redis is down")
+        return [self.values.get(key) for key in keys]
+
+    def set_many(self, items):
+        if self.down:
+            raise ConnectionError("redis is down")
+        self.values.update(items)
+
+
+def test_falls_back_to_disk_and_retries_redis_after_cooldown(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(module.time, "monotonic", lambda: now[0])
+    primary, fallback = MemoryStore(), MemoryStore()
+    cache = EmbeddingCache(primary, fallback, retry_after=30)
+    vector = np.ones(3, dtype=np.float32)
+
+    primary.down = True
+    cache.set_many({"a": vector})
+    assert list(fallback.values) == ["a"]
+
+    primary.down = False
+    now[0] = 10
+    assert cache.get_many(["a"])[0] is not None
+    assert cache.store is fallback
+
+    now[0] = 31
+    assert cache.get_many(["a"]) == [None]
+    assert cache.store is primary
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
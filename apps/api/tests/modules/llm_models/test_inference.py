@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from src.modules.llm_models.inference import AsyncMicroBatcher
+
+
+def make_batcher(batches):
+    async def process(items):
+        batches.append(items)
+        await asyncio.sleep(1 if "slow" in items else 0)
+        if "bad" in items:
+            raise RuntimeError("provider down")
+        return [item.upper() for item in items]
+
+    return AsyncMicroBatcher("test", process, max_batch_size=2, max_wait=0.001)
+
+
+def test_slow_batch_does_not_hold_up_later_batches():
+    batches = []
+    batcher = make_batcher(batches)
+
+    async def run():
+        slow = asyncio.create_task(batcher.acall("slow"))
+        await asyncio.sleep(0.01)
+        outputs = await asyncio.wait_for(
+            asyncio.gather(batcher.acall("a"), batcher.acall("b")), timeout=0.5
+        )
+        assert not slow.done()
+        slow.cancel()
+        return outputs
+
+    assert asyncio.run(run()) == ["A", "B"]
+    assert batches == [["slow"], ["a", "b"]]
+
+
+def test_failed_batch_raises_and_cancelled_jobs_are_skipped():
+    batches = []
+    batcher = make_batcher(batches)
+
+    async def run():
+        gone = asyncio.create_task(batcher.acall("gone"))
+        await asyncio.sleep(0)
+        gone.cancel()
+        with pytest.raises(RuntimeError):
+            await batcher.acall("bad")
+
+    asyncio.run(run())
+    assert batches == [["bad"]]
+    assert batcher.get_metrics().batches == 1
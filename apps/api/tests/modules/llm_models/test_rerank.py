@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from src.modules.llm_models.rerank import Reranker
+
+
+class FakeInference:
+    def __init__(self, seconds_per_unit):
+        self.rerank_scores = type("Batcher", (), {"seconds_per_unit": seconds_per_unit})
+        self.calls = []
+
+    async def arerank(self, query, documents):
+        self.calls.append(documents)
+        return [float(len(document)) for document in documents]
+
+
+DOCUMENTS = ["a", "ccc", "bb", "dddd", "e", "ff"]
+
+
+def test_reranks_within_budget():
+    inference = FakeInference(seconds_per_unit=0.001)
+    reranker = Reranker(inference, batch_size=4, probe_interval=10)
+
+    ranking = asyncio.run(
+        reranker.arerank("query", DOCUMENTS, limit=2, deadline=time.perf_counter() + 1)
+    )
+
+    assert ranking == [3, 1]
+    assert inference.calls == [DOCUMENTS[:4], DOCUMENTS[4:]]
+
+
+def test_over_budget_keeps_vector_order_and_probes_in_background():
+    inference = FakeInference(seconds_per_unit=1)
+    reranker = Reranker(inference, batch_size=4, probe_interval=10)
+
+    async def run():
+        deadline = time.perf_counter() + 0.5
+        first = await reranker.arerank("query", DOCUMENTS, limit=2, deadline=deadline)
+        assert inference.calls == []
+        second = await reranker.arerank("query", DOCUMENTS, limit=2, deadline=deadline)
+        await asyncio.sleep(0)
+        return first, second
+
+    assert asyncio.run(run()) == ([0, 1], [0, 1])
+    assert inference.calls == [DOCUMENTS[:4]]
@@ -0,0 +1,34 @@
+import pytest
+
+from src.utils.minhash import MinHasher, get_signature
+
+TEXT = (
+    "Senior Python engineer with ten years of experience building distributed "
+    "systems, data pipelines and search infrastructure. ΔΙΑΣΤΗΜΑ ΣΧΕΔΙΑΣΜΟΣ."
+)
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 16, len(TEXT)])
+def test_signature_of_pieces_matches_whole_text(size):
+    hasher = MinHasher()
+
+    for start in range(0, len(TEXT), size):
+        hasher.update(TEXT[start : start + size])
+
+    assert hasher.signature() == get_signature(TEXT)
+
+
+@pytest.mark.parametrize(
+    "text", ["", "  --  ", "two words", "exactly five short words"]
+)
+def test_short_texts(text):
+    hasher = MinHasher()
+
+    for character in text:
+        hasher.update(character)
+
+    assert hasher.signature() == get_signature(text)
+
+
+def test_text_without_words_has_no_signature():
+    assert get_signature("-- ... --") is None
@@ -1,6 +1,9 @@
+import { useEffect } from 'react';
+import { fetchEventSource } from '@microsoft/fetch-event-source';
 import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 
-import type { IEnqueueDocumentRequest, IIngestDocumentsRequest } from '@/types';
+import { getToken } from '@/apis/http';
+import type { IEnqueueDocumentRequest, IIngestDocumentsRequest, IIngestionEvent } from '@/types';
 
 import {
   enqueueDocument,
@@ -12,6 +15,8 @@ import {
   removeKnowledgeBase,
 } from '../requests/knowledge-base.requests';
 
+const API_URL = import.meta.env.VITE_API_URL;
+
 export const useEnqueueDocument = () => {
   return useMutation({
     mutationFn: async (data: IEnqueueDocumentRequest) => {
@@ -85,3 +90,46 @@ export const useKnowledgeBase = (id: string) =>
     },
     enabled: !!id,
   });
+
+/**
+ * Refresh knowledge base queries as ingestion progress is pushed by the API,
+ * instead of polling the task status.
+ */
+export const useIngestionEvents = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const ctrl = new AbortController();
+
+    const subscribe = async () => {
+      await fetchEventSource(`${API_URL}/api/knowledge-base/events`, {
+        headers: {
+          'Authorization': `Bearer ${await getToken()}`,
+        },
+        signal: ctrl.signal,
+        openWhenHidden: true,
+        onmessage(message) {
+          if (!message.data) return;
+
+          const data = JSON.parse(message.data) as IIngestionEvent;
+
+          void queryClient.invalidateQueries({ queryKey: ['knowledge-bases'] });
+
+          if (data.knowledge_base_document_id) {
+            void queryClient.invalidateQueries({
+              queryKey: ['knowledge-base', data.knowledge_base_document_id],
+            });
+          }
+
+          if (data.file_id) {
+            void queryClient.invalidateQueries({ queryKey: ['knowledge-base-file', data.file_id] });
+          }
+        },
+      });
+    };
+
+    void subscribe();
+
+    return () => ctrl.abort();
+  }, [queryClient]);
+};
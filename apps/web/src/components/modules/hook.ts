@@ -141,6 +141,46 @@ const useChatMessages = () => {
           break;
         }
 
+        case 'message_delta': {
+          const data = JSON.parse(message.data) as { text: string };
+
+          setMessages((prev) =>
+            prev.map((message) => {
+              if (message.id !== botMessageId) return message;
+
+              return {
+                ...message,
+                id: botMessageId,
+                message: message.message + data.text,
+                isLoading: false,
+                role: 'bot',
+                isStreaming: true,
+              } satisfies IMessage;
+            })
+          );
+          break;
+        }
+
+        case 'reason_delta': {
+          const data = JSON.parse(message.data) as { text: string };
+
+          setMessages((prev) =>
+            prev.map((message) => {
+              if (message.id !== botMessageId) return message;
+
+              return {
+                ...message,
+                id: botMessageId,
+                reason: (message.reason ?? '') + data.text,
+                isLoading: false,
+                role: 'bot',
+                isStreaming: true,
+              } satisfies IMessage;
+            })
+          );
+          break;
+        }
+
         case 'reason': {
           const data = JSON.parse(message.data) as { text: string };
 
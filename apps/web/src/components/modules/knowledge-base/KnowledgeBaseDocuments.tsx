@@ -12,7 +12,7 @@ import {
 } from '@tanstack/react-table';
 import dayjs from 'dayjs';
 
-import { useKnowledgeBases } from '@/apis/queries/knowledge-base.queries';
+import { useIngestionEvents, useKnowledgeBases } from '@/apis/queries/knowledge-base.queries';
 import { getExtractionStatusColor, getFileIcon } from '@/lib/utils';
 import type { IKnowledgeBaseDocumentWithFile } from '@/types';
 
@@ -22,6 +22,7 @@ const columnHelper = createColumnHelper<IKnowledgeBaseDocumentWithFile>();
 
 const KnowledgeBaseDocuments = () => {
   const knowledgeBases = useKnowledgeBases();
+  useIngestionEvents();
   const [rowSelection, setRowSelection] = useState<RowSelectionState>({});
 
   const columns = useMemo(
@@ -66,6 +66,28 @@ export interface IKnowledgeBaseDocumentWithFile extends IKnowledgeBaseDocument {
   file: IFile;
 }
 
+export type IngestionEventType =
+  | 'parsing'
+  | 'parsed'
+  | 'duplicate'
+  | 'embedded'
+  | 'candidate_created'
+  | 'completed'
+  | 'failed';
+
+export interface IIngestionEvent {
+  event: IngestionEventType;
+  file_id?: string;
+  knowledge_base_document_id?: string;
+  candidate_id?: string;
+  duplicate_of_id?: string;
+  batch_id?: string;
+  pages?: number;
+  chunks?: number;
+  error?: string;
+  timestamp: string;
+}
+
 export interface ICandidateExperience {
   months_in_experience?: number;
   company: string;